@@ -0,0 +1,80 @@
+"""
+Benchmark of the vectorized drawdown statistics against the original loop.
+
+The backtest scripts used to compute the drawdown duration by walking the
+underwater flags of an equity curve in a Python for-loop. This script
+times that loop against :func:`drawdowns.max_drawdown_and_duration` for a
+long tick-like equity curve and for a (time x series) panel, which the
+loop has to process column by column, and checks that both give the same
+results.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+
+from drawdowns import drawdown_stats, max_drawdown_and_duration
+
+
+def legacy_max_drawdown_and_duration(equity: np.ndarray) -> tuple[float, int]:
+    """Original implementation with a Python loop over the underwater flags."""
+    peak = np.maximum.accumulate(equity)
+    dd = equity / peak - 1.0  #  drawdown series (<= 0)
+    underwater = dd < 0.0
+    max_dur = 0
+    cur = 0
+    for flag in underwater:
+        if flag:
+            cur += 1
+            if cur > max_dur:
+                max_dur = cur
+        else:
+            cur = 0
+    return float(dd.min()), int(max_dur)
+
+
+def legacy_panel(equity: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Apply the loop to every column of a (time x series) panel."""
+    results = [legacy_max_drawdown_and_duration(equity[:, k])
+               for k in range(equity.shape[1])]
+    max_dd, dur = zip(*results)
+    return np.array(max_dd), np.array(dur)
+
+
+def timed(func: Callable, *args) -> tuple[float, object]:
+    """Return wall time (s) and result of one call."""
+    t0 = time.perf_counter()
+    out = func(*args)
+    return time.perf_counter() - t0, out
+
+
+if __name__ == "__main__":
+    n_ticks = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    rng = np.random.default_rng(seed=5)
+
+    print("Maximum drawdown and duration: Python loop vs vectorized")
+    equity = np.cumprod(1.0 + rng.normal(0.0, 1e-4, size=n_ticks))
+    t_old, old = timed(legacy_max_drawdown_and_duration, equity)
+    t_new, new = timed(max_drawdown_and_duration, equity)
+    t_stats, stats = timed(drawdown_stats, equity)
+    assert old == new and new == (float(stats.max_drawdown), int(stats.duration))
+    print(f"  1 curve x {n_ticks} ticks   loop: {t_old:7.3f} s  "
+          f"vectorized: {t_new:7.3f} s  (x{t_old / t_new:.1f})  "
+          f"with positions: {t_stats:7.3f} s")
+
+    panel = np.cumprod(1.0 + rng.normal(0.0003, 0.01, size=(2520, 5000)), axis=0)
+    t_old, old = timed(legacy_panel, panel)
+    t_new, new = timed(max_drawdown_and_duration, panel)
+    t_stats, stats = timed(drawdown_stats, panel)
+    assert np.array_equal(old[0], new[0]) and np.array_equal(old[1], new[1])
+    assert np.array_equal(new[1], stats.duration)
+    print(f"  {panel.shape[1]} curves x {panel.shape[0]} days  loop: {t_old:7.3f} s  "
+          f"vectorized: {t_new:7.3f} s  (x{t_old / t_new:.1f})  "
+          f"with positions: {t_stats:7.3f} s")
@@ -0,0 +1,213 @@
+"""
+Throughput benchmark for the event model of the event-based backtester.
+
+Runs the same momentum strategy on a long synthetic price series twice:
+once with the original event model (plain dataclasses with a string
+``type`` field, dispatched by an if/elif chain with isinstance asserts)
+and once with the current one from event_back_minimal.py (slotted events
+with integer type codes and a dispatch table). A third run uses the
+engine's vectorized mode, which replaces the event loop by the strategy's
+``compute_signals`` kernel. All runs must produce the same equity curve;
+the script reports events processed per second.
+
+Usage: python code/bench_event_engine.py [number_of_bars]
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque
+
+import numpy as np
+
+from event_back_minimal import (ArrayDataHandler, BacktestEngine, MarketEvent,
+                                NaiveExecutionHandler, SimpleMomentumStrategy,
+                                SimplePortfolio)
+
+
+# --- Original event model (kept for comparison) -----------------------------
+
+
+@dataclass
+class LegacyEvent:
+    type: str
+
+
+@dataclass
+class LegacyMarketEvent(LegacyEvent):
+    time_index: int
+    price: float
+
+
+@dataclass
+class LegacySignalEvent(LegacyEvent):
+    time_index: int
+    signal: float
+
+
+@dataclass
+class LegacyOrderEvent(LegacyEvent):
+    time_index: int
+    quantity: float
+
+
+@dataclass
+class LegacyFillEvent(LegacyEvent):
+    time_index: int
+    quantity: float
+    price: float
+
+
+class LegacyStrategy(SimpleMomentumStrategy):
+    def on_market_event(self, event, events) -> None:
+        if self.last_price is None:
+            self.last_price = event.price
+            return
+        ret = np.log(event.price / self.last_price)
+        if abs(ret) < self.threshold:
+            self.last_price = event.price
+            return
+        self.last_price = event.price
+        signal = np.sign(ret)
+        events.append(
+            LegacySignalEvent(type="SIGNAL", time_index=event.time_index, signal=signal)
+        )
+
+
+class LegacyPortfolio(SimplePortfolio):
+    def on_market_event(self, event) -> None:
+        self.latest_price = event.price
+        equity = self.cash + self.position * event.price
+        self.equity_history.append(equity)
+        self.dates.append(event.time_index)
+
+    def on_signal_event(self, event, events) -> None:
+        if self.latest_price is None:
+            return
+        quantity = event.signal - self.position
+        if quantity != 0.0:
+            events.append(
+                LegacyOrderEvent(type="ORDER", time_index=event.time_index,
+                                 quantity=quantity)
+            )
+
+
+    def on_fill_event(self, event) -> None:
+        if self.latest_price is None:
+            return
+        trade_value = event.quantity * self.latest_price
+        self.position += event.quantity
+        self.cash -= trade_value
+
+
+class LegacyExecution(NaiveExecutionHandler):
+    def on_order_event(self, event, events) -> None:
+        events.append(
+            LegacyFillEvent(type="FILL", time_index=event.time_index,
+                            quantity=event.quantity, price=0.0)
+        )
+
+
+class LegacyEngine(BacktestEngine):
+    def run(self, mode: str="event") -> None:
+        while self.data_handler.continue_backtest:
+            self.data_handler.update_bars(self.events)
+            while self.events:
+                event = self.events.popleft()
+                if event.type == "MARKET":
+                    assert isinstance(event, LegacyMarketEvent)
+                    self.strategy.on_market_event(event, self.events)
+                    self.portfolio.on_market_event(event)
+                elif event.type == "SIGNAL":
+                    assert isinstance(event, LegacySignalEvent)
+                    self.portfolio.on_signal_event(event, self.events)
+                elif event.type == "ORDER":
+                    assert isinstance(event, LegacyOrderEvent)
+                    self.execution.on_order_event(event, self.events)
+                elif event.type == "FILL":
+                    assert isinstance(event, LegacyFillEvent)
+                    self.portfolio.on_fill_event(event)
+
+
+# --- Synthetic data ---------------------------------------------------------
+
+
+class SyntheticDataHandler:
+    """Streams an in-memory price array with integer time stamps."""
+
+    def __init__(self, prices: np.ndarray, legacy: bool=False) -> None:
+        self.iterator = enumerate(prices.tolist())
+        self.legacy = legacy
+        self.continue_backtest = True
+
+    def update_bars(self, events: Deque) -> None:
+        try:
+            time_index, price = next(self.iterator)
+        except StopIteration:
+            self.continue_backtest = False
+            return
+        if self.legacy:
+            events.append(LegacyMarketEvent(type="MARKET", time_index=time_index,
+                                            price=price))
+        else:
+            events.append(MarketEvent(time_index, price))
+
+
+def count_events(prices: np.ndarray, threshold: float) -> int:
+    """Number of events the momentum engine processes for a price path."""
+    rets = np.log(prices[1:] / prices[:-1])
+    signals = np.sign(rets[np.abs(rets) >= threshold])
+    previous = np.concatenate([[0.0], signals[:-1]])
+    orders = int((signals != previous).sum())
+    return prices.shape[0] + signals.shape[0] + 2 * orders  #  orders and fills
+
+
+def run_engine(prices: np.ndarray, legacy: bool,
+               mode: str="event") -> tuple[float, np.ndarray]:
+    """Run one backtest and return wall time and equity curve."""
+    if mode == "vectorized":
+        engine = BacktestEngine(
+            ArrayDataHandler.from_arrays(np.arange(prices.shape[0]), prices),
+            SimpleMomentumStrategy(), SimplePortfolio(), NaiveExecutionHandler())
+    elif legacy:
+        engine: BacktestEngine = LegacyEngine(
+            SyntheticDataHandler(prices, legacy=True), LegacyStrategy(),
+            LegacyPortfolio(), LegacyExecution())
+    else:
+        engine = BacktestEngine(
+            SyntheticDataHandler(prices), SimpleMomentumStrategy(),
+            SimplePortfolio(), NaiveExecutionHandler())
+    t0 = time.perf_counter()
+    engine.run(mode)
+    elapsed = time.perf_counter() - t0
+    return elapsed, np.asarray(engine.portfolio.equity_history)
+
+
+if __name__ == "__main__":
+    n_bars = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    rng = np.random.default_rng(seed=5)
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, size=n_bars)))
+    n_events = count_events(prices, SimpleMomentumStrategy().threshold)
+
+    t_old, eq_old = run_engine(prices, legacy=True)
+    t_new, eq_new = run_engine(prices, legacy=False)
+    t_vec, eq_vec = run_engine(prices, legacy=False, mode="vectorized")
+    assert np.array_equal(eq_old, eq_new)
+    assert np.array_equal(eq_new, eq_vec)
+
+    print("Event engine throughput on a synthetic series")
+    print(f"  bars={n_bars}, events={n_events}\n")
+    print(f"  string dataclass events: {t_old:7.2f} s  "
+          f"{n_events / t_old / 1e6:6.3f} M events/s")
+    print(f"  slotted integer events:  {t_new:7.2f} s  "
+          f"{n_events / t_new / 1e6:6.3f} M events/s  (x{t_old / t_new:.2f})")
+    print(f"  vectorized fast path:    {t_vec:7.2f} s  "
+          f"{n_events / t_vec / 1e6:6.3f} M events/s  (x{t_old / t_vec:.2f})")
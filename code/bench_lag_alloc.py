@@ -0,0 +1,69 @@
+"""
+Allocation benchmark for the lagged design matrix of the lag-OLS backtest.
+
+Compares peak memory (via tracemalloc, which tracks NumPy allocations) and
+run time of the original implementation, which stacked copies of the lag
+columns and rebuilt the intercept column in both the fit and the strategy
+step, with the current one, which uses a strided view for the lags and a
+single intercept-augmented design.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+import time
+import tracemalloc
+from typing import Callable
+
+import numpy as np
+
+from vecback_lag_ols import add_intercept, lag_matrix
+
+
+def legacy_pipeline(rets: np.ndarray, lags: int) -> np.ndarray:
+    """Original make_lagged_returns/fit_ols/run_lag_strategy allocations."""
+    n = rets.shape[0]
+    X = np.column_stack(
+        [rets[(lags - k):(n - k)] for k in range(1, lags + 1)]
+    )
+    y = rets[lags:]
+    X_design = np.column_stack([np.ones(X.shape[0]), X])
+    beta = np.linalg.lstsq(X_design, y, rcond=None)[0]
+    X_design = np.column_stack([np.ones(X.shape[0]), X])
+    return X_design @ beta
+
+
+def strided_pipeline(rets: np.ndarray, lags: int) -> np.ndarray:
+    """Current allocations: lag view, one design for fit, none for forecasts."""
+    X = lag_matrix(rets, lags)
+    y = rets[lags:]
+    beta = np.linalg.lstsq(add_intercept(X), y, rcond=None)[0]
+    return beta[0] + X @ beta[1:]
+
+
+def measure(func: Callable[[np.ndarray, int], np.ndarray],
+            rets: np.ndarray, lags: int) -> tuple[float, float, np.ndarray]:
+    """Return peak traced memory (MB), wall time (s), and the forecasts."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    out = func(rets, lags)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2**20, elapsed, out
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(seed=1)
+    rets = rng.normal(0.0, 0.01, size=2_000_000)  #  long synthetic history
+    print("Lagged design matrix: peak traced memory and run time")
+    print(f"  observations={rets.shape[0]}, input={rets.nbytes / 2**20:.1f} MB\n")
+    for lags in (7, 25, 50):
+        mem_old, t_old, y_old = measure(legacy_pipeline, rets, lags)
+        mem_new, t_new, y_new = measure(strided_pipeline, rets, lags)
+        assert np.allclose(y_old, y_new)
+        print(f"  lags={lags:3d}  legacy: {mem_old:8.1f} MB {t_old:6.2f} s  "
+              f"strided: {mem_new:8.1f} MB {t_new:6.2f} s  "
+              f"(peak x{mem_old / mem_new:.2f})")
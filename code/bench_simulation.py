@@ -0,0 +1,95 @@
+"""
+Benchmark of the vectorized AR/VAR simulators against the original loops.
+
+emh_efficiency_test.py and granger_example.py used to fill their return
+arrays step by step in a Python for-loop, one path per call. Building a
+null distribution then needs one call per path. This script times that
+approach against :func:`simulation.simulate_ar` and
+:func:`simulation.simulate_var`, which simulate all paths of a
+(steps x paths) layout at once, and checks that both give the same paths
+for the same shocks.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+import sys
+import time
+from typing import Callable
+
+import numpy as np
+
+from simulation import simulate_ar, simulate_var
+
+
+def legacy_ar1(eps: np.ndarray, rho: float) -> np.ndarray:
+    """Original AR(1) loop, applied path by path to (steps x paths) shocks."""
+    steps, paths = eps.shape
+    r = np.empty((steps, paths))
+    for k in range(paths):
+        r[0, k] = eps[0, k]
+        for t in range(1, steps):
+            r[t, k] = rho * r[t - 1, k] + eps[t, k]  #  AR(1) recursion
+    return r
+
+
+def legacy_coupled(eps_x: np.ndarray, eps_y: np.ndarray, rho_x: float,
+                   beta_xy: float) -> tuple[np.ndarray, np.ndarray]:
+    """Original coupled AR(1) loop, applied path by path."""
+    steps, paths = eps_x.shape
+    x = np.empty((steps, paths))
+    y = np.empty((steps, paths))
+    for k in range(paths):
+        x[0, k] = eps_x[0, k]
+        y[0, k] = eps_y[0, k]
+        for t in range(1, steps):
+            x[t, k] = rho_x * x[t - 1, k] + eps_x[t, k]  #  AR(1) recursion for X
+            y[t, k] = beta_xy * x[t - 1, k] + eps_y[t, k]  #  X drives Y
+    return x, y
+
+
+def timed(func: Callable, *args, **kwargs) -> tuple[float, object]:
+    """Return wall time (s) and result of one call."""
+    t0 = time.perf_counter()
+    out = func(*args, **kwargs)
+    return time.perf_counter() - t0, out
+
+
+if __name__ == "__main__":
+    paths = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    steps = 500
+    rng = np.random.default_rng(seed=3)
+
+    print(f"AR(1) and coupled AR(1) paths: Python loop vs vectorized "
+          f"({paths} paths x {steps} steps)")
+    eps = rng.normal(0.0, 0.02, size=(steps, paths))
+    t_old, old = timed(legacy_ar1, eps, 0.3)
+    t_new, new = timed(simulate_ar, 0.3, eps=eps)
+    assert np.array_equal(old, new)
+    print(f"  AR(1)          loop: {t_old:7.3f} s  vectorized: {t_new:7.3f} s  "
+          f"(x{t_old / t_new:.0f})")
+
+    eps_x = rng.normal(0.0, 0.02, size=(steps, paths))
+    eps_y = rng.normal(0.0, 0.02, size=(steps, paths))
+    coefs = np.array([[0.2, 0.0], [0.5, 0.0]])
+    t_old, (x, y) = timed(legacy_coupled, eps_x, eps_y, 0.2, 0.5)
+    t_new, r = timed(simulate_var, coefs, eps=np.stack([eps_x, eps_y], axis=-1))
+    assert np.array_equal(x, r[..., 0]) and np.array_equal(y, r[..., 1])
+    print(f"  coupled AR(1)  loop: {t_old:7.3f} s  vectorized: {t_new:7.3f} s  "
+          f"(x{t_old / t_new:.0f})")
+
+    #  null distribution of the lag-1 autocorrelation from a million paths
+    n_null = 1_000_000
+    block = 50_000
+    t0 = time.perf_counter()
+    acf1 = []
+    for b0 in range(0, n_null, block):
+        r = simulate_ar(0.0, steps=steps, paths=block, sigma=0.02, rng=rng)
+        r = r - r.mean(axis=0)
+        acf1.append((r[1:] * r[:-1]).sum(axis=0) / (r * r).sum(axis=0))
+    acf1 = np.concatenate(acf1)
+    lo, hi = np.quantile(acf1, [0.025, 0.975])
+    print(f"  {n_null} null paths of the lag-1 autocorrelation: "
+          f"{time.perf_counter() - t0:.2f} s, 95% band [{lo:.4f}, {hi:.4f}]")
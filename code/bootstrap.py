@@ -0,0 +1,250 @@
+"""
+Block-bootstrap confidence intervals for strategy metrics.
+
+Point estimates of a Sharpe ratio or a maximum drawdown say little about
+their sampling uncertainty. The helpers below resample the dates of a
+(time x series) return array and recompute Sharpe ratio, Sortino ratio,
+maximum drawdown, and hit rate on every resample:
+
+- ``stationary_indices`` draws the stationary bootstrap of Politis and
+  Romano (blocks of geometric length with a given mean), and
+- ``block_indices`` draws the circular moving-block bootstrap (blocks of
+  fixed length).
+
+Blocks keep the serial dependence of returns (volatility clusters,
+drawdown spells) that an i.i.d. bootstrap destroys. Resamples are index
+matrices (resamples x time); all series are resampled with the same
+dates, which keeps their cross-correlation. Scoring draws the index rows
+of a chunk of resamples and gathers the returns of a chunk of series
+into one (resamples x time x series) array; both chunks are sized so
+that the index matrix and the gathered array together stay within
+``max_elements`` entries (the scoring temporaries add a few arrays of the
+gathered size on top). Tasks of resamples can be spread over a process
+pool. Every resample draws from its own stream spawned from one
+:class:`numpy.random.SeedSequence`, so results depend on the seed only,
+not on the task size, the number of workers, or the memory bound.
+
+StrategyMetrics.bootstrap_from_returns wraps ``bootstrap_metrics`` for
+pandas input.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+BOOTSTRAP_METRICS = ("sharpe", "sortino", "max_drawdown", "hit_rate")
+
+
+def stationary_indices(rng: np.random.Generator, n_obs: int, n_resamples: int,
+                       mean_block: float) -> np.ndarray:
+    """Index matrix of the stationary bootstrap (resamples x n_obs).
+
+    Every date starts a new block with probability ``1 / mean_block`` at a
+    uniformly drawn position; otherwise the block continues with the
+    next date (wrapping around at the end).
+    """
+    starts = rng.integers(0, n_obs, size=(n_resamples, n_obs))
+    new_block = rng.random((n_resamples, n_obs)) < 1.0 / mean_block
+    new_block[:, 0] = True
+    pos = np.arange(n_obs)
+    block_start = np.maximum.accumulate(np.where(new_block, pos, 0), axis=1)
+    first = np.take_along_axis(starts, block_start, axis=1)
+    return (first + pos - block_start) % n_obs
+
+
+def block_indices(rng: np.random.Generator, n_obs: int, n_resamples: int,
+                  block_length: int) -> np.ndarray:
+    """Index matrix of the circular moving-block bootstrap (resamples x n_obs)."""
+    n_blocks = -(-n_obs // block_length)
+    starts = rng.integers(0, n_obs, size=(n_resamples, n_blocks, 1))
+    idx = (starts + np.arange(block_length)) % n_obs
+    return idx.reshape(n_resamples, -1)[:, :n_obs]
+
+
+def score_resamples(
+    rets: np.ndarray,
+    idx: np.ndarray,
+    periods_per_year: int = 252,
+    risk_free_rate: float = 0.0,
+    sortino_target: float = 0.0,
+) -> dict[str, np.ndarray]:
+    """Metrics of every resample and series (arrays of resamples x series).
+
+    Definitions follow StrategyMetrics; NaN returns are masked.
+    """
+    x = rets[idx]  #  resamples x time x series
+    root_ppy = np.sqrt(periods_per_year)
+    if np.isnan(rets).any():
+        valid = ~np.isnan(x)
+        n = valid.sum(axis=1)
+        x[~valid] = 0.0
+    else:
+        valid, n = True, x.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mu = x.sum(axis=1) / n
+        centered = np.where(valid, x - mu[:, None], 0.0)
+        sigma = np.sqrt((centered * centered).sum(axis=1) / (n - 1))
+        down = (x < sortino_target) & valid
+        shortfall = np.where(down, x - sortino_target, 0.0)  #  masked dates: 0
+        sigma_down = np.sqrt((shortfall * shortfall).sum(axis=1) / down.sum(axis=1))
+        equity = np.cumprod(1.0 + x, axis=1)  #  masked dates keep the level
+        if valid is True:
+            trough = (equity / np.maximum.accumulate(equity, axis=1)).min(axis=1)
+        else:
+            #  masked dates leave the peak alone, so leading NaNs do not
+            #  set a peak of 1.0 before the first return
+            peak = np.fmax.accumulate(np.where(valid, equity, np.nan), axis=1)
+            trough = np.fmin.reduce(equity / peak, axis=1)
+        return {
+            "sharpe": np.where(sigma > 0.0,
+                               (mu - risk_free_rate) / sigma * root_ppy, np.nan),
+            "sortino": np.where(sigma_down > 0.0,
+                                (mu - sortino_target) / sigma_down * root_ppy, np.nan),
+            "max_drawdown": trough - 1.0,
+            "hit_rate": (x > 0.0).sum(axis=1) / n,
+        }
+
+
+_RETS: np.ndarray | None = None  #  per-worker copy of the return array
+
+
+def _init_worker(rets: np.ndarray) -> None:
+    """Store the return array once per worker process."""
+    global _RETS
+    _RETS = rets
+
+
+def _chunk_sizes(n_obs: int, n_series: int, max_elements: int) -> tuple[int, int]:
+    """Resamples and series per chunk for at most ``max_elements`` entries.
+
+    A chunk holds the (resamples x time) index matrix and the gathered
+    (resamples x time x series) returns, that is ``n_obs * (series + 1)``
+    entries per resample. At least one resample of one series is scored.
+    """
+    per_row = max(1, max_elements // n_obs)  #  entries per date and resample
+    cols = max(1, min(n_series, per_row - 1))
+    rows = max(1, per_row // (cols + 1))
+    return rows, cols
+
+
+def _score_task(seeds: list[np.random.SeedSequence], method: str,
+                block_length: float, max_elements: int,
+                params: tuple[int, float, float],
+                rets: np.ndarray | None = None) -> dict[str, np.ndarray]:
+    """Draw and score one resample per seed, chunk by chunk."""
+    rets = _RETS if rets is None else rets
+    n_obs, n_series = rets.shape
+    n_resamples = len(seeds)
+    draw = stationary_indices if method == "stationary" else block_indices
+    rows, cols = _chunk_sizes(n_obs, n_series, max_elements)
+    out = {name: np.empty((n_resamples, n_series)) for name in BOOTSTRAP_METRICS}
+    for b0 in range(0, n_resamples, rows):
+        idx = np.concatenate([draw(np.random.default_rng(s), n_obs, 1, block_length)
+                              for s in seeds[b0:b0 + rows]])
+        for c0 in range(0, n_series, cols):
+            scores = score_resamples(rets[:, c0:c0 + cols], idx, *params)
+            for name, values in scores.items():
+                out[name][b0:b0 + rows, c0:c0 + cols] = values
+    return out
+
+
+def bootstrap_metrics(
+    rets: np.ndarray,
+    n_resamples: int = 1000,
+    method: str = "stationary",
+    block_length: float = 20.0,
+    seed: int | None = None,
+    periods_per_year: int = 252,
+    risk_free_rate: float = 0.0,
+    sortino_target: float = 0.0,
+    max_elements: int = 2**24,
+    task_size: int = 250,
+    max_workers: int = 1,
+) -> dict[str, np.ndarray]:
+    """Bootstrap distribution of the metrics of a (time x series) array.
+
+    Parameters
+    ----------
+    rets : np.ndarray
+        Periodic returns, one column per series (NaN for missing).
+    n_resamples : int
+        Number of bootstrap resamples.
+    method : str
+        ``"stationary"`` (geometric blocks with mean ``block_length``) or
+        ``"block"`` (circular blocks of length ``block_length``).
+    seed : int, optional
+        Entropy of the root SeedSequence; every resample draws from its
+        own spawned stream.
+    max_elements : int
+        Upper bound on the entries of the index matrix and the gathered
+        resample array of one chunk (at least one resample of one series
+        per chunk).
+    task_size : int
+        Number of resamples per process-pool task.
+    max_workers : int
+        Number of worker processes; 1 scores all tasks in this process.
+
+    Returns
+    -------
+    dict
+        One (n_resamples x series) array per metric of BOOTSTRAP_METRICS.
+    """
+    if method not in ("stationary", "block"):
+        raise ValueError(f"unknown bootstrap method {method!r}")
+    rets = np.ascontiguousarray(rets, dtype=float)
+    if method == "block":
+        block_length = int(block_length)
+    seeds = np.random.SeedSequence(seed).spawn(n_resamples)
+    tasks = [seeds[b0:b0 + task_size] for b0 in range(0, n_resamples, task_size)]
+    params = (periods_per_year, risk_free_rate, sortino_target)
+    if max_workers == 1:
+        results = [_score_task(task, method, block_length, max_elements, params, rets)
+                   for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(rets,)) as pool:
+            results = list(pool.map(
+                _score_task, tasks, [method] * len(tasks),
+                [block_length] * len(tasks), [max_elements] * len(tasks),
+                [params] * len(tasks)))
+    return {name: np.concatenate([r[name] for r in results])
+            for name in BOOTSTRAP_METRICS}
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(seed=11)
+    rets = rng.normal(0.0004, 0.01, size=(2520, 20))
+    for workers in (1, 4):
+        t0 = time.perf_counter()
+        dist = bootstrap_metrics(rets, n_resamples=2000, seed=42, max_workers=workers)
+        print(f"2000 stationary resamples of 20 series x 2520 days, "
+              f"{workers} worker(s): {time.perf_counter() - t0:.2f} s")
+    lo, hi = np.nanquantile(dist["sharpe"][:, 0], [0.025, 0.975])
+    print(f"95% interval of the first series' Sharpe ratio: [{lo:.2f}, {hi:.2f}]")
+
+    #  identity resample of a panel with gaps and a positive Sortino target
+    #  reproduces StrategyMetrics
+    import pandas as pd
+
+    from strategy_metrics import StrategyMetrics
+
+    gaps = rets[:, :5].copy()
+    gaps[rng.random(gaps.shape) < 0.1] = np.nan
+    gaps[:30, 0] = np.nan  #  late start
+    metrics = StrategyMetrics(sortino_target=0.0005)
+    table = metrics.summarize_from_returns(
+        pd.DataFrame(gaps, index=pd.bdate_range("2015-01-01", periods=gaps.shape[0])))
+    scores = score_resamples(gaps, np.arange(gaps.shape[0])[None, :], 252, 0.0, 0.0005)
+    for name in BOOTSTRAP_METRICS:
+        assert np.allclose(scores[name][0], table.loc[name].to_numpy(dtype=float))
+    print("identity resample with NaN gaps matches StrategyMetrics "
+          "(Sortino target 5 bps)")
@@ -0,0 +1,134 @@
+"""
+Vectorized drawdown statistics for one or many equity curves.
+
+All functions take an equity array of any dimension and treat one axis
+(``axis=0`` by default, i.e. time along the rows) as time, so a (time x
+series) panel is processed column-wise in a single pass:
+
+- ``drawdown_curve`` returns the drawdown relative to the running peak,
+- ``max_drawdown_and_duration`` returns the maximum drawdown and the
+  longest spell under water (in periods), and
+- ``drawdown_stats`` adds the start, trough, and recovery positions of
+  the maximum drawdown.
+
+The length of the current spell under water is the number of underwater
+periods so far minus that number at the most recent peak; the latter is a
+running maximum, so no Python loop over time is needed. NaN entries (for
+example dates on which a series has no price) are skipped: they neither
+set a new peak nor end a spell under water.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class DrawdownStats:
+    """Drawdown statistics per equity curve (positions along time).
+
+    ``start`` is the last peak before the trough of the maximum drawdown
+    and ``recovery`` the first period back at that peak (-1 if the curve
+    has not recovered). For curves without a drawdown all three
+    positions equal the first valid period.
+    """
+
+    max_drawdown: np.ndarray  #  most negative drawdown (<= 0)
+    duration: np.ndarray  #  longest spell under water in periods
+    start: np.ndarray
+    trough: np.ndarray
+    recovery: np.ndarray
+
+
+def _positions(n: int, ndim: int, axis: int, dtype: type) -> np.ndarray:
+    """Return 0, ..., n - 1 shaped to broadcast along ``axis``."""
+    shape = [1] * ndim
+    shape[axis] = n
+    return np.arange(n, dtype=dtype).reshape(shape)
+
+
+def drawdown_curve(equity: np.ndarray, axis: int=0) -> np.ndarray:
+    """Return the drawdown ``equity / running peak - 1`` (NaN stays NaN)."""
+    equity = np.asarray(equity, dtype=float)
+    peak = np.fmax.accumulate(equity, axis=axis)  #  ignores NaN entries
+    with np.errstate(invalid="ignore"):
+        return equity / peak - 1.0
+
+
+def _longest_spell(dd: np.ndarray, axis: int) -> np.ndarray:
+    """Return the longest spell under water along ``axis``."""
+    underwater = dd < 0.0  #  False for NaN
+    dtype = np.int32 if dd.shape[axis] < 2**31 else np.int64
+    count = np.cumsum(underwater, axis=axis, dtype=dtype)
+    if dd.ndim == 1:
+        #  spells are the increments of the count between peaks
+        ends = np.append(count[dd >= 0.0], count[-1:])
+        return np.diff(ends, prepend=0).max(initial=0)
+    run = count - np.maximum.accumulate(np.where(dd >= 0.0, count, 0), axis=axis)
+    return run.max(axis=axis, initial=0)
+
+
+def max_drawdown_and_duration(equity: np.ndarray, axis: int=0):
+    """Compute maximum drawdown and its duration (in periods).
+
+    Returns a ``(float, int)`` pair for a 1-D equity curve and two arrays
+    (one value per curve) otherwise; curves without any valid value
+    give NaN and 0.
+    """
+    dd = drawdown_curve(equity, axis)
+    max_dd = np.fmin.reduce(dd, axis=axis)  #  NaN only if all entries are NaN
+    max_dur = _longest_spell(dd, axis)
+    if dd.ndim == 1:
+        return float(max_dd), int(max_dur)
+    return max_dd, max_dur.astype(np.int64)
+
+
+def drawdown_stats(equity: np.ndarray, axis: int=0) -> DrawdownStats:
+    """Compute maximum drawdown, duration, and start/trough/recovery positions."""
+    dd = drawdown_curve(equity, axis)
+    axis = axis % dd.ndim
+    at_peak = dd >= 0.0
+    n = dd.shape[axis]
+    pos = _positions(n, dd.ndim, axis, np.int32 if n < 2**31 else np.int64)
+
+    trough = np.expand_dims(np.argmin(np.where(np.isnan(dd), np.inf, dd), axis=axis), axis)
+    max_dd = np.take_along_axis(dd, trough, axis)
+    #  last peak up to each period, read off at the trough
+    last_peak = np.maximum.accumulate(np.where(at_peak, pos, -1), axis=axis)
+    start = np.take_along_axis(last_peak, trough, axis)
+    start = np.where(start < 0, trough, start)  #  all-NaN curves
+    #  first peak after the trough (the curve is back at the old high)
+    after = at_peak & (pos > trough)
+    recovery = np.where(after.any(axis=axis, keepdims=True),
+                        np.argmax(after, axis=axis, keepdims=True), -1)
+    recovery = np.where(max_dd < 0.0, recovery, trough)
+
+    def squeeze(a: np.ndarray) -> np.ndarray:  #  NumPy scalars for 1-D input
+        return np.squeeze(a, axis=axis)[()]
+
+    return DrawdownStats(
+        max_drawdown=squeeze(max_dd),
+        duration=np.asarray(_longest_spell(dd, axis), dtype=np.int64)[()],
+        start=squeeze(start.astype(np.int64)),
+        trough=squeeze(trough.astype(np.int64)),
+        recovery=squeeze(recovery.astype(np.int64)),
+    )
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(seed=3)
+    rets = rng.normal(0.0003, 0.01, size=(2520, 5))
+    equity = np.cumprod(1.0 + rets, axis=0)
+    stats = drawdown_stats(equity)
+    print("Drawdowns of five simulated equity curves (10 years, daily)")
+    for k in range(equity.shape[1]):
+        print(f"  curve {k}: max_dd={stats.max_drawdown[k]:8.4f}  "
+              f"duration={stats.duration[k]:5d}  start={stats.start[k]:5d}  "
+              f"trough={stats.trough[k]:5d}  recovery={stats.recovery[k]:5d}")
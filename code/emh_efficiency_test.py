@@ -1,6 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
+from simulation import simulate_ar
+
 """
 Autocorrelation-based efficiency test for synthetic return series.
 
@@ -26,11 +28,7 @@ def simulate_returns(steps: int=500, rho: float=0.0) -> np.ndarray:
     """
     rng = np.random.default_rng(seed=3)
     eps = rng.normal(0.0, 0.02, size=steps)  #  daily shocks
-    r = np.empty(steps)
-    r[0] = eps[0]
-    for t in range(1, steps):
-        r[t] = rho * r[t - 1] + eps[t]  #  AR(1) recursion
-    return r
+    return simulate_ar(rho, eps=eps)  #  AR(1) recursion as a linear filter
 
 
 def autocorr(x: np.ndarray, max_lag: int=10) -> np.ndarray:
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+import json
+import math
+import time
 from collections import deque
 from dataclasses import dataclass
-from typing import Deque, List
+from functools import partial
+from typing import TYPE_CHECKING, Callable, ClassVar, Deque, Iterable, Iterator, List
 
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from drawdowns import max_drawdown_and_duration
+from price_store import PricePanel, load_column, open_panel
+
+if TYPE_CHECKING:
+    from event_journal import EventJournal
+    from execution_models import ExecutionModel
+
 """
 Minimal event-based backtest using daily prices for a single instrument.
 The design follows the architecture sketched in Section 7:
@@ -25,36 +36,54 @@ plt.style.use("seaborn-v0_8")
 
 # --- Event types ------------------------------------------------------------
 
+#  Integer type codes; the event loop uses them to index a dispatch table.
+MARKET, SIGNAL, ORDER, FILL = range(4)
+EVENT_NAMES = ("MARKET", "SIGNAL", "ORDER", "FILL")
+
 
-@dataclass
+@dataclass(slots=True)
 class Event:
-    """Base class for all events."""
+    """Base class for all events.
 
-    type: str  #  marker for dispatch in the event loop
+    Events use ``__slots__`` (no per-instance ``__dict__``) and carry
+    their type as a class-level integer code rather than a string field.
+    """
 
+    type: ClassVar[int]  #  code for dispatch in the event loop
 
-@dataclass
+
+@dataclass(slots=True)
 class MarketEvent(Event):
     """Represents a new market bar for a single instrument."""
 
+    type: ClassVar[int] = MARKET
     time_index: pd.Timestamp  #  timestamp of the new bar
     price: float  #  last traded price
+    bar: np.ndarray | None = None  #  all columns of the bar (OHLC, symbols)
+    symbol: str | None = None  #  instrument (multi-instrument engines)
+    volume: float = math.nan  #  traded volume of the bar (NaN if unknown)
 
 
-@dataclass
+@dataclass(slots=True)
 class SignalEvent(Event):
     """Represents a directional trading signal (+1 long, -1 short, 0 flat)."""
 
+    type: ClassVar[int] = SIGNAL
     time_index: pd.Timestamp
     signal: float
+    symbol: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderEvent(Event):
     """Represents an order to change position to target units."""
 
+    type: ClassVar[int] = ORDER
     time_index: pd.Timestamp
     quantity: float
+    symbol: str | None = None
+    price: float = math.nan  #  reference (market) price when the order was sent
+    volume: float = math.nan  #  bar volume when the order was sent
 
 
 from pathlib import Path
@@ -63,13 +92,19 @@ DATA_URL = ("https://raw.githubusercontent.com/yhilpisch/epatcode/"
             "refs/heads/main/data/epat_eod.csv")
 
 
-@dataclass
+@dataclass(slots=True)
 class FillEvent(Event):
-    """Represents an immediate fill of an order at the current price."""
+    """Represents an immediate fill of an order.
+
+    A ``price`` of 0.0 means a fill at the latest market price.
+    """
 
+    type: ClassVar[int] = FILL
     time_index: pd.Timestamp
     quantity: float
     price: float
+    symbol: str | None = None
+    commission: float = 0.0  #  explicit costs, paid in cash
 
 
 # --- Core components --------------------------------------------------------
@@ -86,12 +121,25 @@ class CSVDataHandler:
         else:
             src = DATA_URL
             print(f"Local data file {local_path} not found, loading from {DATA_URL}")
-        df = pd.read_csv(src, parse_dates=["Date"]).set_index("Date")
-        prices = df[column].astype(float).dropna()  #  clean symbol series
+        prices = load_column(src, column)  #  clean symbol series (zero-copy)
         self.prices = prices
         self.iterator = iter(prices.items())
         self.continue_backtest = True
 
+    def __len__(self) -> int:
+        """Number of bars the handler streams (for sizing recorders)."""
+        return self.prices.shape[0]
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        """Return all bars as int64 nanosecond time stamps and prices.
+
+        Used by the vectorized engine modes; the stream counts as
+        consumed afterwards.
+        """
+        self.continue_backtest = False
+        ns = self.prices.index.to_numpy().astype("datetime64[ns]").view(np.int64)
+        return ns, self.prices.to_numpy(dtype=float)
+
     def update_bars(self, events: Deque[Event]) -> None:
         """Push the next MarketEvent into the event queue."""
         try:
@@ -99,7 +147,175 @@ class CSVDataHandler:
         except StopIteration:
             self.continue_backtest = False
             return
-        events.append(MarketEvent(type="MARKET", time_index=time_index, price=price))
+        events.append(MarketEvent(time_index, price))
+
+
+class ArrayDataHandler:
+    """Streams bars from NumPy arrays with an integer cursor.
+
+    Bars come in chunks of a datetime64 array and a float64 array with
+    one row per bar and one column per field (OHLC, several symbols,
+    ...). Each chunk is converted once to plain Python lists, so the
+    per-bar work is a list lookup rather than pandas iteration. The
+    ``price`` of a MarketEvent is taken from ``price_column``; the whole
+    row is attached as ``bar`` when there is more than one column. Bars
+    without a price in ``price_column`` are skipped. If ``volume_column``
+    is given, its value becomes the event's ``volume``, which execution
+    models with volume-dependent costs use.
+
+    Time stamps are emitted as integer nanoseconds since the epoch,
+    which avoids creating a timestamp object per bar.
+
+    Because chunks are pulled lazily from an iterator, datasets larger
+    than RAM can be replayed (see :meth:`from_csv` and
+    :meth:`from_panel`).
+    """
+
+    def __init__(self, chunks: Iterable[tuple[np.ndarray, np.ndarray]],
+                 columns: list[str], price_column: str | int=0,
+                 size_hint: int=0, volume_column: str | int | None=None) -> None:
+        self.columns = list(columns)
+        self.price_column = (self.columns.index(price_column)
+                             if isinstance(price_column, str) else price_column)
+        self.volume_column = (self.columns.index(volume_column)
+                              if isinstance(volume_column, str) else volume_column)
+        self.size_hint = size_hint  #  expected number of bars (0 if unknown)
+        self._chunks: Iterator[tuple[np.ndarray, np.ndarray]] = iter(chunks)
+        self._times: list[int] = []
+        self._prices: list[float] = []
+        self._volumes: list[float] = []
+        self._bars: np.ndarray | None = None
+        self._cursor = 0
+        self.continue_backtest = True
+
+    @classmethod
+    def from_arrays(cls, dates: np.ndarray, values: np.ndarray,
+                    columns: list[str] | None=None, price_column: str | int=0,
+                    volume_column: str | int | None=None) -> "ArrayDataHandler":
+        """Stream in-memory arrays (1-D values are a single column)."""
+        values = np.asarray(values, dtype=float)
+        if values.ndim == 1:
+            values = values[:, None]
+        columns = columns or [f"col_{j}" for j in range(values.shape[1])]
+        return cls([(dates, values)], columns, price_column, size_hint=values.shape[0],
+                   volume_column=volume_column)
+
+    @classmethod
+    def from_csv(cls, path: str="data/epat_eod.csv",
+                 columns: list[str] | None=None, price_column: str | int=0,
+                 chunksize: int=100_000,
+                 volume_column: str | int | None=None) -> "ArrayDataHandler":
+        """Stream a CSV file in chunks of ``chunksize`` rows."""
+        if columns is None:
+            columns = [c for c in pd.read_csv(path, nrows=0).columns if c != "Date"]
+
+        def chunks() -> Iterator[tuple[np.ndarray, np.ndarray]]:
+            for df in pd.read_csv(path, usecols=["Date", *columns],
+                                  parse_dates=["Date"], chunksize=chunksize):
+                yield df["Date"].to_numpy(), df[columns].to_numpy(dtype=float)
+
+        return cls(chunks(), columns, price_column, volume_column=volume_column)
+
+    @classmethod
+    def from_panel(cls, path: str="data/epat_eod.csv",
+                   columns: list[str] | None=None, price_column: str | int=0,
+                   chunksize: int=100_000,
+                   volume_column: str | int | None=None) -> "ArrayDataHandler":
+        """Stream symbols from the memory-mapped price store.
+
+        Only one block of ``chunksize`` rows is materialized at a time;
+        the rest stays on disk (or in the shared page cache).
+        """
+        panel = open_panel(path)
+        columns = panel.columns if columns is None else list(columns)
+        return cls(_panel_chunks(panel, columns, chunksize), columns, price_column,
+                   size_hint=panel.dates.shape[0], volume_column=volume_column)
+
+    def __length_hint__(self) -> int:
+        """Expected number of bars, used via :func:`operator.length_hint`."""
+        return self.size_hint
+
+    def _pull(self) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return the next non-empty chunk as (int64 ns, values) or None."""
+        for dates, values in self._chunks:
+            values = np.asarray(values, dtype=float)
+            keep = ~np.isnan(values[:, self.price_column])
+            if not keep.all():
+                dates, values = dates[keep], values[keep]
+            if values.shape[0] > 0:
+                return np.asarray(dates).astype("datetime64[ns]").view(np.int64), values
+        return None
+
+    def _next_chunk(self) -> bool:
+        """Load the next non-empty chunk; return False when exhausted."""
+        chunk = self._pull()
+        if chunk is None:
+            return False
+        ns, values = chunk
+        self._times = ns.tolist()
+        self._prices = values[:, self.price_column].tolist()
+        if self.volume_column is not None:
+            self._volumes = values[:, self.volume_column].tolist()
+        self._bars = values if values.shape[1] > 1 else None
+        self._cursor = 0
+        return True
+
+    def arrays(self, with_volume: bool=False) -> tuple[np.ndarray, ...]:
+        """Return all remaining bars as int64 nanosecond time stamps and prices.
+
+        Reads the rest of the stream into memory (used by the vectorized
+        engine modes); the stream counts as consumed afterwards. With
+        ``with_volume`` the bar volumes follow as a third array (NaN
+        without a ``volume_column``).
+        """
+        i = self._cursor
+        times = [np.array(self._times[i:], dtype=np.int64)]
+        prices = [np.array(self._prices[i:], dtype=float)]
+        volumes = [np.array(self._volumes[i:] if self._volumes
+                            else [math.nan] * len(prices[0]), dtype=float)]
+        while (chunk := self._pull()) is not None:
+            times.append(chunk[0])
+            prices.append(chunk[1][:, self.price_column])
+            volumes.append(chunk[1][:, self.volume_column]
+                           if self.volume_column is not None
+                           else np.full(chunk[1].shape[0], np.nan))
+        self._times, self._prices, self._volumes, self._bars = [], [], [], None
+        self._cursor = 0
+        self.continue_backtest = False
+        if with_volume:
+            return np.concatenate(times), np.concatenate(prices), np.concatenate(volumes)
+        return np.concatenate(times), np.concatenate(prices)
+
+    def update_bars(self, events: Deque[Event]) -> None:
+        """Push the next MarketEvent into the event queue."""
+        i = self._cursor
+        if i == len(self._times):
+            if not self._next_chunk():
+                self.continue_backtest = False
+                return
+            i = 0
+        self._cursor = i + 1
+        bar = self._bars[i] if self._bars is not None else None
+        if self._volumes:
+            events.append(MarketEvent(self._times[i], self._prices[i], bar,
+                                      volume=self._volumes[i]))
+        else:
+            events.append(MarketEvent(self._times[i], self._prices[i], bar))
+
+
+def _panel_chunks(panel: PricePanel, columns: list[str],
+                  chunksize: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield dense row blocks of selected symbols from a price store."""
+    positions = [panel.positions(col) for col in columns]
+    values = [panel.values(col) for col in columns]
+    n_rows = panel.dates.shape[0]
+    for r0 in range(0, n_rows, chunksize):
+        r1 = min(r0 + chunksize, n_rows)
+        block = np.full((r1 - r0, len(columns)), np.nan)
+        for j, (pos, val) in enumerate(zip(positions, values)):
+            lo, hi = np.searchsorted(pos, [r0, r1])  #  this symbol's rows in block
+            block[pos[lo:hi] - r0, j] = val[lo:hi]
+        yield np.asarray(panel.dates[r0:r1]), block
 
 
 class SimpleMomentumStrategy:
@@ -120,16 +336,27 @@ class SimpleMomentumStrategy:
         if self.last_price is None:
             self.last_price = event.price
             return
-        ret = np.log(event.price / self.last_price)
+        ret = math.log(event.price / self.last_price)  #  scalar log-return
         if abs(ret) < self.threshold:
             # ignore small moves to avoid over-trading
             self.last_price = event.price
             return
         self.last_price = event.price
-        signal = np.sign(ret)  # +1 after up-move, -1 after down-move
-        events.append(
-            SignalEvent(type="SIGNAL", time_index=event.time_index, signal=signal)
-        )
+        signal = 1.0 if ret > 0.0 else (-1.0 if ret < 0.0 else 0.0)  # +1 after up-move, -1 after down-move
+        events.append(SignalEvent(event.time_index, signal, event.symbol))
+
+    def compute_signals(self, prices: np.ndarray) -> np.ndarray:
+        """Vectorized kernel: the signal emitted at each bar (NaN if none).
+
+        Produces the same signals as feeding ``prices`` bar by bar to
+        :meth:`on_market_event`, which lets :class:`BacktestEngine` run
+        the strategy in its vectorized modes.
+        """
+        signals = np.full(prices.shape[0], np.nan)
+        ret = np.log(prices[1:] / prices[:-1])
+        move = np.abs(ret) >= self.threshold
+        signals[1:][move] = np.sign(ret[move])
+        return signals
 
 
 class NaiveExecutionHandler:
@@ -140,31 +367,174 @@ class NaiveExecutionHandler:
         # The portfolio passes in the price it observed with the order.
         events.append(
             FillEvent(
-                type="FILL",
-                time_index=event.time_index,
-                quantity=event.quantity,
-                price=0.0,  # overwritten by portfolio when processing fill
+                event.time_index,
+                event.quantity,
+                0.0,  # price is set by the portfolio when processing the fill
+                event.symbol,
             )
         )
 
 
-class SimplePortfolio:
-    """Tracks position, cash, and equity for a single-instrument strategy."""
+def _to_ns(time_index: object) -> int:
+    """Convert a bar timestamp to integer nanoseconds since the epoch."""
+    if type(time_index) is int:  #  already nanoseconds (ArrayDataHandler)
+        return time_index
+    if isinstance(time_index, pd.Timestamp):
+        return time_index.value
+    if isinstance(time_index, np.datetime64):
+        return int(time_index.astype("datetime64[ns]").astype(np.int64))
+    return int(time_index)
+
+
+def vectorized_fills(prices: np.ndarray, signals: np.ndarray,
+                     position: float=0.0, cash: float=1.0,
+                     model: ExecutionModel | None=None,
+                     volume: np.ndarray | None=None) -> dict[str, np.ndarray]:
+    """Positions, fills, and equity of a signal series in bulk.
+
+    Mirrors the event path of SimplePortfolio and NaiveExecutionHandler:
+    every signal becomes an order (and an immediate fill at the bar's
+    price) for the difference between signal and current position, and
+    the recorded state of a bar is the one before that bar's fills.
+
+    Parameters
+    ----------
+    prices : np.ndarray
+        Price of every bar.
+    signals : np.ndarray
+        Signal emitted at every bar, NaN where the strategy is silent.
+    position, cash : float
+        Portfolio state before the first bar.
+    model : execution_models.ExecutionModel, optional
+        Execution model for fill prices and commissions (default: fills
+        at the bar's price without costs).
+    volume : np.ndarray, optional
+        Volume of every bar, passed to the execution model (the volume
+        of the bar at which an order is filled, as in the event path).
+
+    Returns
+    -------
+    dict
+        ``equity``, ``position``, and ``cash`` (state before the fills of
+        each bar), ``quantity`` (units filled at each bar), and ``flow``
+        (cash paid for each bar's fills, including commissions).
+    """
+    n = prices.shape[0]
+    has_signal = ~np.isnan(signals)
+    last = np.maximum.accumulate(np.where(has_signal, np.arange(n), -1))
+    target = np.where(last >= 0, signals[np.maximum(last, 0)], position)
+    position_before = np.concatenate([[position], target[:-1]])
+    quantity = target - position_before
+    if model is None:
+        flow = quantity * prices
+    else:
+        fill_price, commission = model.fill_arrays(quantity, prices, volume)
+        flow = quantity * fill_price + commission
+    #  subtract.accumulate applies ``cash -= flow`` in bar order, so the
+    #  cash path matches the event loop to the last bit
+    cash_after = np.subtract.accumulate(np.concatenate([[cash], flow]))
+    cash_before = cash_after[:-1]
+    return {
+        "equity": cash_before + position_before * prices,
+        "position": position_before,
+        "cash": cash_before,
+        "quantity": quantity,
+        "flow": flow,
+    }
 
-    def __init__(self, initial_cash: float=1.0) -> None:
+
+class SimplePortfolio:
+    """Tracks position, cash, and equity for a single-instrument strategy.
+
+    By default the equity curve is recorded in the Python lists
+    ``equity_history`` and ``dates``. Passing ``capacity`` (for example
+    ``len(data_handler)``) switches to a recording mode with
+    preallocated typed arrays instead: int64 nanosecond time stamps and
+    float64 equity, position, and cash, which avoids one boxed object
+    per value on multi-million-bar runs. The arrays double in size
+    whenever they fill up; :meth:`history` exposes them as a DataFrame.
+    """
+
+    def __init__(self, initial_cash: float=1.0,
+                 capacity: int | None=None) -> None:
         self.initial_cash = initial_cash
         self.position = 0.0  #  number of units held (can be negative)
         self.cash = initial_cash
         self.equity_history: List[float] = []
         self.dates: List[pd.Timestamp] = []
         self.latest_price: float | None = None  #  last observed market price
+        self.latest_volume = math.nan  #  volume of the last bar (NaN if unknown)
+        self.record_arrays = capacity is not None
+        self.n_records = 0  #  filled length of the arrays
+        size = max(capacity or 0, 1)
+        self._ts = np.empty(size if self.record_arrays else 0, dtype=np.int64)
+        self._equity = np.empty_like(self._ts, dtype=np.float64)
+        self._position = np.empty_like(self._equity)
+        self._cash = np.empty_like(self._equity)
+
+    def _grow(self) -> None:
+        """Double the capacity of the recording arrays."""
+        size = 2 * self._ts.shape[0]
+        for name in ("_ts", "_equity", "_position", "_cash"):
+            old = getattr(self, name)
+            new = np.empty(size, dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
 
     def on_market_event(self, event: MarketEvent) -> None:
         """Update equity based on the latest market price."""
         self.latest_price = event.price
+        self.latest_volume = event.volume
         equity = self.cash + self.position * event.price
-        self.equity_history.append(equity)
-        self.dates.append(event.time_index)
+        if not self.record_arrays:
+            self.equity_history.append(equity)
+            self.dates.append(event.time_index)
+            return
+        i = self.n_records
+        if i == self._ts.shape[0]:
+            self._grow()
+        self._ts[i] = _to_ns(event.time_index)
+        self._equity[i] = equity
+        self._position[i] = self.position
+        self._cash[i] = self.cash
+        self.n_records = i + 1
+
+    def record_bulk(self, time_ns: np.ndarray, equity: np.ndarray,
+                    position: np.ndarray, cash: np.ndarray) -> None:
+        """Append many bars of recorded state at once (vectorized runs)."""
+        if not self.record_arrays:
+            self.equity_history.extend(equity.tolist())
+            self.dates.extend(time_ns.tolist())  #  nanoseconds, like ArrayDataHandler
+            return
+        i, n = self.n_records, time_ns.shape[0]
+        while i + n > self._ts.shape[0]:
+            self._grow()
+        self._ts[i:i + n] = time_ns
+        self._equity[i:i + n] = equity
+        self._position[i:i + n] = position
+        self._cash[i:i + n] = cash
+        self.n_records = i + n
+
+    def history(self) -> pd.DataFrame:
+        """Return the recorded history as a DataFrame indexed by date.
+
+        In array mode the columns are equity, position, and cash (state
+        at each bar before that bar's fills); in list mode only equity
+        is available.
+        """
+        if not self.record_arrays:
+            return pd.DataFrame({"equity": self.equity_history},
+                                index=pd.DatetimeIndex(self.dates, name="Date"))
+        n = self.n_records
+        index = pd.DatetimeIndex(self._ts[:n].view("datetime64[ns]"), name="Date")
+        return pd.DataFrame(
+            {
+                "equity": self._equity[:n],
+                "position": self._position[:n],
+                "cash": self._cash[:n],
+            },
+            index=index,
+        )
 
     def on_signal_event(self, event: SignalEvent, events: Deque[Event]) -> None:
         """Translate a trading signal into an order for target position."""
@@ -173,21 +543,159 @@ class SimplePortfolio:
         target_position = event.signal  # long 1 unit or short 1 unit
         quantity = target_position - self.position  # change from current position
         if quantity != 0.0:
-            events.append(
-                OrderEvent(
-                    type="ORDER",
-                    time_index=event.time_index,
-                    quantity=quantity,
-                )
-            )
+            events.append(OrderEvent(event.time_index, quantity, event.symbol,
+                                     self.latest_price, self.latest_volume))
 
     def on_fill_event(self, event: FillEvent) -> None:
-        """Apply fill to position and cash; assume fill at latest price."""
+        """Apply fill to position and cash (at the latest price if unpriced)."""
         if self.latest_price is None:
             return
-        trade_value = event.quantity * self.latest_price
+        trade_value = event.quantity * (event.price or self.latest_price)
         self.position += event.quantity
-        self.cash -= trade_value
+        self.cash -= trade_value + event.commission
+
+
+#  Log-linear latency buckets: 2**HIST_SUB_BITS sub-buckets per power of two
+#  (about 6% resolution), exact below 2**(HIST_SUB_BITS + 1) ns.
+HIST_SUB_BITS = 4
+HIST_BINS = 64 << HIST_SUB_BITS
+DEPTH_BINS = 64  #  queue depths >= DEPTH_BINS - 1 share the last bin
+
+
+def _latency_bin(ns: int) -> int:
+    """Histogram bin of a latency in nanoseconds."""
+    shift = ns.bit_length() - HIST_SUB_BITS - 1
+    if shift <= 0:
+        return ns
+    return min((shift << HIST_SUB_BITS) + (ns >> shift), HIST_BINS - 1)
+
+
+def _bin_bounds(idx: int) -> tuple[int, int]:
+    """Lower and upper (exclusive) latency bound of a histogram bin."""
+    if idx < 2 << HIST_SUB_BITS:
+        return idx, idx + 1
+    shift = (idx >> HIST_SUB_BITS) - 1
+    mantissa = idx - (shift << HIST_SUB_BITS)
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+class EngineProfiler:
+    """Collects per-handler latencies and queue depths of an engine run.
+
+    Pass an instance to :meth:`BacktestEngine.run` to switch to an
+    instrumented copy of the event loop; without a profiler the plain
+    loop runs and the instrumentation costs nothing. Every handler call
+    is timed with :func:`time.perf_counter_ns` and counted in a
+    preallocated log-linear histogram, from which percentiles are
+    derived. The queue depth is sampled before every event is taken
+    from the queue.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = []  #  step names in recording order
+        self.events: list[str] = []  #  event type handled by each step
+        self.counts: list[int] = []
+        self.total_ns: list[int] = []
+        self.min_ns: list[int] = []
+        self.max_ns: list[int] = []
+        self.hists: list[list[int]] = []
+        self.depth_hist = [0] * DEPTH_BINS
+        self.max_depth = 0
+        self.wall_ns = 0  #  duration of the instrumented run
+
+    def slot(self, name: str, event: str) -> int:
+        """Return the recording slot of a handler, creating it if needed."""
+        if name in self.names:
+            return self.names.index(name)
+        self.names.append(name)
+        self.events.append(event)
+        self.counts.append(0)
+        self.total_ns.append(0)
+        self.min_ns.append(1 << 62)  #  above any measured latency
+        self.max_ns.append(0)
+        self.hists.append([0] * HIST_BINS)
+        return len(self.names) - 1
+
+    def record(self, slot: int, ns: int) -> None:
+        """Add one handler latency to a slot."""
+        self.counts[slot] += 1
+        self.total_ns[slot] += ns
+        if ns > self.max_ns[slot]:
+            self.max_ns[slot] = ns
+        if ns < self.min_ns[slot]:
+            self.min_ns[slot] = ns
+        self.hists[slot][_latency_bin(ns)] += 1
+
+    def record_depth(self, depth: int) -> None:
+        """Add one queue-depth sample."""
+        self.depth_hist[min(depth, DEPTH_BINS - 1)] += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def _percentile(self, slot: int, q: float) -> float:
+        """Approximate latency percentile of a slot from its histogram.
+
+        Returns the midpoint of the bin holding the percentile, clamped
+        to the observed minimum and maximum latency.
+        """
+        count = self.counts[slot]
+        if count == 0:
+            return float("nan")
+        rank = math.ceil(q / 100.0 * count)
+        seen = 0
+        for idx, n in enumerate(self.hists[slot]):
+            seen += n
+            if n and seen >= rank:
+                lo, hi = _bin_bounds(idx)
+                mid = (lo + hi - 1) / 2.0
+                return float(min(max(mid, self.min_ns[slot]), self.max_ns[slot]))
+        return float("nan")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return handler statistics (latencies in nanoseconds) by step."""
+        busy = sum(self.total_ns)
+        rows = []
+        for j, name in enumerate(self.names):
+            count, total = self.counts[j], self.total_ns[j]
+            rows.append({
+                "event": self.events[j],
+                "count": count,
+                "total_ms": total / 1e6,
+                "share": total / busy if busy else float("nan"),
+                "mean_ns": total / count if count else float("nan"),
+                "p50_ns": self._percentile(j, 50.0),
+                "p90_ns": self._percentile(j, 90.0),
+                "p99_ns": self._percentile(j, 99.0),
+                "max_ns": self.max_ns[j],
+            })
+        return pd.DataFrame(rows, index=pd.Index(self.names, name="handler"))
+
+    def queue_depth(self) -> dict:
+        """Return summary statistics of the sampled queue depths."""
+        samples = sum(self.depth_hist)
+        mean = (sum(d * n for d, n in enumerate(self.depth_hist)) / samples
+                if samples else float("nan"))
+        return {
+            "samples": samples,
+            "mean": mean,
+            "max": self.max_depth,
+            "histogram": {d: n for d, n in enumerate(self.depth_hist) if n},
+        }
+
+    def to_dict(self) -> dict:
+        """Return all statistics as JSON-serializable data."""
+        return {
+            "wall_ms": self.wall_ns / 1e6,
+            "handlers": self.to_frame().reset_index().to_dict(orient="records"),
+            "queue_depth": self.queue_depth(),
+        }
+
+    def to_json(self, path: str | Path | None=None) -> str:
+        """Serialize :meth:`to_dict` to JSON, optionally writing it to a file."""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            Path(path).write_text(text)
+        return text
 
 
 class BacktestEngine:
@@ -202,31 +710,179 @@ class BacktestEngine:
         self.portfolio = portfolio
         self.execution = execution
         self.events: Deque[Event] = deque()
-
-    def run(self) -> None:
-        """Main event loop: process data, signals, orders, and fills."""
+        self.events_processed = 0  #  events handled by the event loop
+
+    def dispatch_table(self) -> list[Callable[[Event], None]]:
+        """Return the handler for each event type, indexed by type code."""
+        events = self.events
+        strategy_on_market = self.strategy.on_market_event
+        portfolio_on_market = self.portfolio.on_market_event
+
+        def on_market(event: MarketEvent) -> None:
+            strategy_on_market(event, events)
+            portfolio_on_market(event)
+
+        table: list[Callable[[Event], None]] = [None] * len(EVENT_NAMES)  # type: ignore[list-item]
+        table[MARKET] = on_market
+        table[SIGNAL] = partial(self.portfolio.on_signal_event, events=events)
+        table[ORDER] = partial(self.execution.on_order_event, events=events)
+        table[FILL] = self.portfolio.on_fill_event
+        return table
+
+    def profile_steps(self) -> list[list[tuple[str, Callable[[Event], None]]]]:
+        """Return the named handler steps of each event type (profiling).
+
+        Same calls as :meth:`dispatch_table`, but a MarketEvent is split
+        into its strategy and portfolio handlers so both can be timed.
+        """
+        events = self.events
+        steps: list[list[tuple[str, Callable[[Event], None]]]] = [[] for _ in EVENT_NAMES]
+        steps[MARKET] = [
+            ("strategy.on_market_event",
+             partial(self.strategy.on_market_event, events=events)),
+            ("portfolio.on_market_event", self.portfolio.on_market_event),
+        ]
+        steps[SIGNAL] = [("portfolio.on_signal_event",
+                          partial(self.portfolio.on_signal_event, events=events))]
+        steps[ORDER] = [("execution.on_order_event",
+                         partial(self.execution.on_order_event, events=events))]
+        steps[FILL] = [("portfolio.on_fill_event", self.portfolio.on_fill_event)]
+        return steps
+
+    def run(self, mode: str="event", profiler: EngineProfiler | None=None,
+            journal: EventJournal | None=None) -> pd.DataFrame | None:
+        """Run the backtest.
+
+        Parameters
+        ----------
+        mode : str
+            ``"event"`` processes every bar through the event queue.
+            ``"vectorized"`` computes signals with the strategy's
+            ``compute_signals(prices)`` kernel and positions, orders,
+            fills, and equity in bulk NumPy (see :func:`vectorized_fills`);
+            the portfolio ends up with the same history and state.
+            ``"verify"`` runs the event loop and the vectorized path on
+            the same bars and returns the bars on which they differ.
+        profiler : EngineProfiler, optional
+            Records handler latencies and queue depths (event mode only;
+            other modes raise ValueError).
+        journal : event_journal.EventJournal, optional
+            Appends every processed event to a binary log (event mode
+            only, without profiler; other combinations raise ValueError).
+
+        Returns
+        -------
+        pd.DataFrame or None
+            For ``"verify"``, the mismatching bars with the event and
+            vectorized value of each recorded field (empty if both paths
+            agree); None otherwise.
+        """
+        if mode != "event" and (profiler is not None or journal is not None):
+            raise ValueError(f"profiler and journal require mode='event', not {mode!r}")
+        if profiler is not None and journal is not None:
+            raise ValueError("journal cannot be combined with profiler")
+        if mode == "event":
+            if profiler is None:
+                self._run_events(journal)
+            else:
+                self._run_events_profiled(profiler)
+            return None
+        if mode not in ("vectorized", "verify"):
+            raise ValueError(f"unknown mode {mode!r}")
+        if not hasattr(self.strategy, "compute_signals"):
+            raise TypeError(f"{type(self.strategy).__name__} has no compute_signals kernel")
+        if getattr(self.data_handler, "volume_column", None) is None:
+            time_ns, prices = self.data_handler.arrays()
+            volume = None
+        else:
+            time_ns, prices, volume = self.data_handler.arrays(with_volume=True)
+        portfolio = self.portfolio
+        signals = self.strategy.compute_signals(prices)
+        bulk = vectorized_fills(prices, signals, portfolio.position, portfolio.cash,
+                                getattr(self.execution, "model", None), volume)
+        if mode == "vectorized":
+            #  events the loop would have handled: bars, signals, orders, fills
+            self.events_processed += (prices.shape[0] + int((~np.isnan(signals)).sum())
+                                      + 2 * int(np.count_nonzero(bulk["quantity"])))
+            portfolio.record_bulk(time_ns, bulk["equity"], bulk["position"], bulk["cash"])
+            if prices.shape[0] > 0:
+                portfolio.position = float(bulk["position"][-1] + bulk["quantity"][-1])
+                portfolio.cash = float(bulk["cash"][-1] - bulk["flow"][-1])
+                portfolio.latest_price = float(prices[-1])
+            return None
+
+        start = portfolio.n_records if portfolio.record_arrays else len(portfolio.equity_history)
+        dates = time_ns.view("datetime64[ns]")
+        if volume is None:
+            replay = ArrayDataHandler.from_arrays(dates, prices)
+        else:
+            replay = ArrayDataHandler.from_arrays(
+                dates, np.column_stack([prices, volume]), ["price", "volume"],
+                volume_column=1)
+        self._run_events(data_handler=replay)  #  self.data_handler stays as it is
+        event = portfolio.history().iloc[start:]
+        event.index = pd.DatetimeIndex(time_ns.view("datetime64[ns]"), name="Date")
+        vector = pd.DataFrame({col: bulk[col] for col in event.columns}, index=event.index)
+        differs = (event != vector).any(axis=1).to_numpy()
+        return pd.concat({"event": event[differs], "vectorized": vector[differs]}, axis=1)
+
+    def _run_events(self, journal: EventJournal | None=None,
+                    data_handler: ArrayDataHandler | None=None) -> None:
+        """Main event loop: process data, signals, orders, and fills.
+
+        ``data_handler`` replaces :attr:`data_handler` as the bar source
+        of this loop only (the verify mode replays the bars through it).
+        """
+        handlers = self.dispatch_table()  #  one lookup per event, no if/elif
+        if journal is not None:
+            handlers = journal.wrap_table(handlers)
+        events = self.events
+        data_handler = self.data_handler if data_handler is None else data_handler
+        update_bars = data_handler.update_bars
+        n_events = 0
+        while data_handler.continue_backtest:
+            update_bars(events)
+
+            while events:
+                event = events.popleft()
+                handlers[event.type](event)
+                n_events += 1
+        self.events_processed += n_events
+        if journal is not None:
+            journal.flush()
+
+    def _run_events_profiled(self, profiler: EngineProfiler) -> None:
+        """Instrumented copy of :meth:`_run_events`."""
+        clock = time.perf_counter_ns
+        record, record_depth = profiler.record, profiler.record_depth
+        steps = [
+            [(profiler.slot(name, EVENT_NAMES[code]), func) for name, func in named]
+            for code, named in enumerate(self.profile_steps())
+        ]
+        bars_slot = profiler.slot("data_handler.update_bars", "-")
+        events = self.events
+        update_bars = self.data_handler.update_bars
+        n_events = 0
+        start = clock()
         while self.data_handler.continue_backtest:
-            self.data_handler.update_bars(self.events)
-
-            while self.events:
-                event = self.events.popleft()
-                if event.type == "MARKET":
-                    assert isinstance(event, MarketEvent)
-                    self.strategy.on_market_event(event, self.events)
-                    self.portfolio.on_market_event(event)
-                elif event.type == "SIGNAL":
-                    assert isinstance(event, SignalEvent)
-                    self.portfolio.on_signal_event(event, self.events)
-                elif event.type == "ORDER":
-                    assert isinstance(event, OrderEvent)
-                    self.execution.on_order_event(event, self.events)
-                elif event.type == "FILL":
-                    assert isinstance(event, FillEvent)
-                    self.portfolio.on_fill_event(event)
-
-
-def plot_equity(dates: List[pd.Timestamp],
-                equity: List[float],
+            t0 = clock()
+            update_bars(events)
+            record(bars_slot, clock() - t0)
+
+            while events:
+                record_depth(len(events))
+                event = events.popleft()
+                for slot, func in steps[event.type]:
+                    t0 = clock()
+                    func(event)
+                    record(slot, clock() - t0)
+                n_events += 1
+        profiler.wall_ns += clock() - start
+        self.events_processed += n_events
+
+
+def plot_equity(dates: List[pd.Timestamp] | pd.DatetimeIndex,
+                equity: List[float] | pd.Series,
                 outfile: str="figures/event_back_minimal_equity.pdf") -> None:
     """Plot normalized equity curve for the event-based strategy."""
     eq_arr = np.asarray(equity)
@@ -243,37 +899,21 @@ def plot_equity(dates: List[pd.Timestamp],
     plt.close(fig)
 
 
-def max_drawdown_and_duration(equity: np.ndarray) -> tuple[float, int]:
-    """Compute maximum drawdown and its duration (in periods)."""
-    peak = np.maximum.accumulate(equity)
-    dd = equity / peak - 1.0  #  drawdown series (<= 0)
-    underwater = dd < 0.0
-    max_dur = 0
-    cur = 0
-    for flag in underwater:
-        if flag:
-            cur += 1
-            if cur > max_dur:
-                max_dur = cur
-        else:
-            cur = 0
-    return float(dd.min()), int(max_dur)
-
-
 if __name__ == "__main__":
     data_handler = CSVDataHandler()
     strategy = SimpleMomentumStrategy()
-    portfolio = SimplePortfolio()
+    portfolio = SimplePortfolio(capacity=len(data_handler))  #  typed arrays
     execution = NaiveExecutionHandler()
     engine = BacktestEngine(data_handler, strategy, portfolio, execution)
     engine.run()
-    plot_equity(portfolio.dates, portfolio.equity_history)
+    history = portfolio.history()
+    plot_equity(history.index, history["equity"])
 
-    eq_arr = np.asarray(portfolio.equity_history)
+    eq_arr = history["equity"].to_numpy()
     eq_norm = eq_arr / eq_arr[0]
 
     # benchmark: buy-and-hold equity on the same dates
-    prices_eff = data_handler.prices.loc[portfolio.dates]
+    prices_eff = data_handler.prices.loc[history.index]
     eq_bh = prices_eff.to_numpy() / float(prices_eff.iloc[0])
 
     # log-returns for benchmark and strategy
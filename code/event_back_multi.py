@@ -0,0 +1,340 @@
+"""
+Multi-instrument, multi-strategy extension of the event-based backtester.
+
+BacktestEngine in event_back_minimal.py streams one price column into one
+strategy and one portfolio. The classes below reuse its events and event
+loop for many instruments at once:
+
+- MergedDataHandler merges one time-ordered feed per symbol with a heap
+  (:func:`heapq.merge`), so bars of all symbols arrive in timestamp order,
+- MultiBacktestEngine routes every MarketEvent to the strategy of its
+  symbol through the dispatch table, and
+- MultiPortfolio keeps cash and per-symbol positions in one account and
+  records the marked-to-market equity once per timestamp.
+
+All symbols are read from the memory-mapped price store, so the data file
+is parsed (at most) once, however many instruments are backtested.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+from __future__ import annotations
+
+import heapq
+import operator
+from functools import partial
+from itertools import repeat
+from typing import TYPE_CHECKING, Callable, Deque, Iterable, Iterator, Mapping
+
+import numpy as np
+import pandas as pd
+
+from event_back_minimal import (EVENT_NAMES, FILL, MARKET, ORDER, SIGNAL,
+                                BacktestEngine, EngineProfiler, Event,
+                                FillEvent, MarketEvent, NaiveExecutionHandler,
+                                OrderEvent, SignalEvent, SimpleMomentumStrategy,
+                                _to_ns)
+from price_store import open_panel
+
+if TYPE_CHECKING:
+    from event_journal import EventJournal
+
+
+def _feed(rank: int, chunks: Iterable[tuple[np.ndarray, np.ndarray]]
+          ) -> Iterator[tuple[int, int, float]]:
+    """Yield (time_ns, rank, price) bars of one symbol, chunk by chunk."""
+    for time_ns, prices in chunks:
+        yield from zip(time_ns.tolist(), repeat(rank, len(prices)), prices.tolist())
+
+
+def _chunked(time_ns: np.ndarray, prices: np.ndarray,
+             chunksize: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Split aligned time stamp and price arrays into blocks."""
+    for i in range(0, prices.shape[0], chunksize):
+        yield time_ns[i:i + chunksize], prices[i:i + chunksize]
+
+
+class MergedDataHandler:
+    """Merges per-symbol price feeds into one time-ordered bar stream.
+
+    Parameters
+    ----------
+    feeds : mapping
+        Symbol -> iterable of (int64 nanosecond time stamps, prices)
+        chunks in ascending time order.
+
+    Bars with equal time stamps are emitted in the order of ``feeds``.
+    Only one chunk per symbol is held in memory at a time.
+    """
+
+    def __init__(self, feeds: Mapping[str, Iterable[tuple[np.ndarray, np.ndarray]]]) -> None:
+        self.symbols = list(feeds)
+        self._bars = heapq.merge(
+            *(_feed(rank, chunks) for rank, chunks in enumerate(feeds.values()))
+        )
+        self.continue_backtest = True
+
+    @classmethod
+    def from_arrays(cls, series: Mapping[str, tuple[np.ndarray, np.ndarray]],
+                    chunksize: int=65_536) -> "MergedDataHandler":
+        """Merge in-memory (datetime64 or int64 ns dates, prices) pairs."""
+        feeds = {}
+        for symbol, (dates, prices) in series.items():
+            time_ns = np.asarray(dates).astype("datetime64[ns]").view(np.int64)
+            feeds[symbol] = _chunked(time_ns, np.asarray(prices, dtype=float), chunksize)
+        return cls(feeds)
+
+    @classmethod
+    def from_panel(cls, path: str="data/epat_eod.csv",
+                   columns: list[str] | None=None,
+                   chunksize: int=65_536) -> "MergedDataHandler":
+        """Merge symbols of the memory-mapped price store (valid prices only)."""
+        panel = open_panel(path)
+        columns = panel.columns if columns is None else list(columns)
+        time_ns = np.asarray(panel.dates).astype("datetime64[ns]").view(np.int64)
+
+        def chunks(column: str) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+            positions, prices = panel.positions(column), panel.values(column)
+            for i in range(0, prices.shape[0], chunksize):
+                yield time_ns[positions[i:i + chunksize]], prices[i:i + chunksize]
+
+        return cls({col: chunks(col) for col in columns})
+
+    def update_bars(self, events: Deque[Event]) -> None:
+        """Push the next MarketEvent (of any symbol) into the event queue."""
+        try:
+            time_ns, rank, price = next(self._bars)
+        except StopIteration:
+            self.continue_backtest = False
+            return
+        events.append(MarketEvent(time_ns, price, None, self.symbols[rank]))
+
+
+class MultiPortfolio:
+    """One account holding positions in several instruments.
+
+    Each signal sets the target position of its symbol to ``signal``
+    times the symbol's ``units``; fills are booked at the symbol's latest
+    price. Equity (cash plus all positions marked at their latest
+    prices) is recorded once per timestamp, after all bars and fills of
+    that timestamp, in typed arrays that grow as needed.
+
+    Parameters
+    ----------
+    symbols : list of str
+        Instruments that may be traded.
+    initial_cash : float
+        Starting cash.
+    units : float or mapping, optional
+        Position size per unit of signal (global or per symbol).
+    capacity : int, optional
+        Expected number of timestamps (initial size of the recorders).
+    record_positions : bool
+        Also record the per-symbol positions at every timestamp.
+    """
+
+    def __init__(self, symbols: list[str], initial_cash: float=1.0,
+                 units: float | Mapping[str, float]=1.0,
+                 capacity: int | None=None, record_positions: bool=False) -> None:
+        self.symbols = list(symbols)
+        self._index = {symbol: j for j, symbol in enumerate(self.symbols)}
+        if isinstance(units, Mapping):
+            self.units = [float(units.get(s, 1.0)) for s in self.symbols]
+        else:
+            self.units = [float(units)] * len(self.symbols)
+        self.initial_cash = initial_cash
+        self.cash = initial_cash
+        self.positions = [0.0] * len(self.symbols)  #  units held per symbol
+        self.latest_prices = [0.0] * len(self.symbols)  #  0.0 until the first bar
+        self.current_time: int | None = None  #  timestamp being processed (ns)
+        self.record_positions = record_positions
+        self.n_records = 0
+        size = max(capacity or 0, 1)
+        self._ts = np.empty(size, dtype=np.int64)
+        self._equity = np.empty(size)
+        self._cash = np.empty(size)
+        self._pos = np.empty((size if record_positions else 0, len(self.symbols)))
+
+    def equity(self) -> float:
+        """Cash plus all positions marked at their latest prices."""
+        return self.cash + sum(map(operator.mul, self.positions, self.latest_prices))
+
+    def _grow(self) -> None:
+        """Double the capacity of the recording arrays."""
+        for name in ("_ts", "_equity", "_cash", "_pos"):
+            old = getattr(self, name)
+            if old.shape[0] == 0:
+                continue
+            new = np.empty((2 * old.shape[0],) + old.shape[1:], dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    def _record(self) -> None:
+        """Store the state at the close of the current timestamp."""
+        i = self.n_records
+        if i == self._ts.shape[0]:
+            self._grow()
+        self._ts[i] = self.current_time
+        self._equity[i] = self.equity()
+        self._cash[i] = self.cash
+        if self.record_positions:
+            self._pos[i] = self.positions
+        self.n_records = i + 1
+
+    def on_market_event(self, event: MarketEvent) -> None:
+        """Update the symbol's price; close the previous timestamp if needed."""
+        time_ns = _to_ns(event.time_index)
+        if time_ns != self.current_time:
+            if self.current_time is not None:
+                self._record()
+            self.current_time = time_ns
+        self.latest_prices[self._index[event.symbol]] = event.price
+
+    def on_signal_event(self, event: SignalEvent, events: Deque[Event]) -> None:
+        """Translate a signal into an order for the symbol's target position."""
+        j = self._index[event.symbol]
+        quantity = event.signal * self.units[j] - self.positions[j]
+        if quantity != 0.0:
+            events.append(OrderEvent(event.time_index, quantity, event.symbol,
+                                     self.latest_prices[j]))
+
+    def on_fill_event(self, event: FillEvent) -> None:
+        """Apply a fill (at the symbol's latest price if unpriced)."""
+        j = self._index[event.symbol]
+        self.positions[j] += event.quantity
+        self.cash -= event.quantity * (event.price or self.latest_prices[j]) + event.commission
+
+    def history(self) -> pd.DataFrame:
+        """Return equity and cash (and positions) per timestamp.
+
+        Includes the last timestamp, whose state is final once the
+        backtest has finished.
+        """
+        n = self.n_records
+        ts, equity, cash = self._ts[:n], self._equity[:n], self._cash[:n]
+        pos = self._pos[:n]
+        if self.current_time is not None:
+            ts = np.append(ts, self.current_time)
+            equity = np.append(equity, self.equity())
+            cash = np.append(cash, self.cash)
+            if self.record_positions:
+                pos = np.vstack([pos, self.positions])
+        index = pd.DatetimeIndex(ts.view("datetime64[ns]"), name="Date")
+        frame = pd.DataFrame({"equity": equity, "cash": cash}, index=index)
+        if self.record_positions:
+            positions = pd.DataFrame(pos, index=index, columns=self.symbols)
+            frame = pd.concat({"total": frame, "position": positions}, axis=1)
+        return frame
+
+
+class StrategyRouter:
+    """Forwards every MarketEvent to the strategy of its symbol."""
+
+    def __init__(self, strategies: Mapping[str, SimpleMomentumStrategy]) -> None:
+        self.strategies = dict(strategies)
+
+    def on_market_event(self, event: MarketEvent, events: Deque[Event]) -> None:
+        """Call the on_market_event handler of the event's symbol."""
+        self.strategies[event.symbol].on_market_event(event, events)
+
+
+class MultiBacktestEngine(BacktestEngine):
+    """Event loop for several instruments, each with its own strategy.
+
+    Parameters
+    ----------
+    data_handler : MergedDataHandler
+        Time-ordered bars of all symbols.
+    strategies : mapping
+        Symbol -> strategy receiving that symbol's MarketEvents.
+    portfolio : MultiPortfolio
+        Shared account for all symbols.
+    execution : NaiveExecutionHandler
+        Turns orders into fills.
+    """
+
+    def __init__(self, data_handler: MergedDataHandler,
+                 strategies: Mapping[str, SimpleMomentumStrategy],
+                 portfolio: MultiPortfolio,
+                 execution: NaiveExecutionHandler) -> None:
+        super().__init__(data_handler, StrategyRouter(strategies),  # type: ignore[arg-type]
+                         portfolio, execution)
+        self.strategies = self.strategy.strategies
+
+    def dispatch_table(self) -> list[Callable[[Event], None]]:
+        """Return the handler for each event type, indexed by type code."""
+        events = self.events
+        routes = {symbol: strategy.on_market_event
+                  for symbol, strategy in self.strategies.items()}
+        portfolio_on_market = self.portfolio.on_market_event
+
+        def on_market(event: MarketEvent) -> None:
+            routes[event.symbol](event, events)  #  per-symbol strategy
+            portfolio_on_market(event)
+
+        table: list[Callable[[Event], None]] = [None] * len(EVENT_NAMES)  # type: ignore[list-item]
+        table[MARKET] = on_market
+        table[SIGNAL] = partial(self.portfolio.on_signal_event, events=events)
+        table[ORDER] = partial(self.execution.on_order_event, events=events)
+        table[FILL] = self.portfolio.on_fill_event
+        return table
+
+    def run(self, mode: str="event", profiler: EngineProfiler | None=None,
+            journal: EventJournal | None=None) -> None:
+        """Run the event loop (the only mode for several instruments)."""
+        if mode != "event":
+            raise ValueError(f"MultiBacktestEngine does not support mode {mode!r}")
+        if profiler is not None and journal is not None:
+            raise ValueError("journal cannot be combined with profiler")
+        if profiler is None:
+            self._run_events(journal)
+        else:
+            self._run_events_profiled(profiler)
+
+
+if __name__ == "__main__":
+    import time
+
+    panel = open_panel("data/epat_eod.csv")
+    symbols = panel.columns
+    first_prices = {s: float(panel.values(s)[0]) for s in symbols}
+
+    #  one unit of notional per symbol at its first price
+    data_handler = MergedDataHandler.from_panel("data/epat_eod.csv", symbols)
+    portfolio = MultiPortfolio(
+        symbols,
+        initial_cash=float(len(symbols)),
+        units={s: 1.0 / p for s, p in first_prices.items()},
+        capacity=panel.dates.shape[0],
+        record_positions=True,
+    )
+    engine = MultiBacktestEngine(
+        data_handler,
+        {s: SimpleMomentumStrategy() for s in symbols},
+        portfolio,
+        NaiveExecutionHandler(),
+    )
+    t0 = time.perf_counter()
+    engine.run()
+    elapsed = time.perf_counter() - t0
+    n_bars = int(panel.offsets[-1])
+
+    history = portfolio.history()
+    equity = history[("total", "equity")] / portfolio.initial_cash
+    positions = history["position"]
+    trades = (positions.diff().fillna(positions) != 0.0).sum()
+
+    print("Multi-instrument event-based momentum backtest")
+    print(f"  symbols={len(symbols)}, bars={n_bars}, timestamps={len(history)}")
+    print(f"  wall time={elapsed:.2f} s ({n_bars / elapsed / 1e3:.0f} k bars/s)\n")
+    print(f"  final equity (normalized) = {equity.iloc[-1]:.3f}")
+    print(f"  max drawdown              = {(equity / equity.cummax() - 1.0).min():.3f}\n")
+    summary = pd.DataFrame({
+        "trades": trades,
+        "final_position": positions.iloc[-1],
+        "final_price": portfolio.latest_prices,
+    })
+    print(summary.round(4).to_string())
@@ -0,0 +1,334 @@
+"""
+Binary event journal for the event-based backtester.
+
+An EventJournal passed to :meth:`BacktestEngine.run` appends every event
+the engine processes to an append-only binary log. Each event becomes one
+fixed-width 40-byte record (see ``JOURNAL_DTYPE``):
+
+- ``time_ns``: bar time stamp as integer nanoseconds since the epoch,
+- ``value``: price (MARKET), signal (SIGNAL), or quantity (ORDER, FILL),
+- ``price``: reference price (ORDER) or fill price (FILL; NaN otherwise),
+- ``cost``: commission (FILL) or bar volume (MARKET, ORDER; NaN if
+  unknown),
+- ``type``: integer event type code, and
+- ``symbol``: index into the symbol table (-1 for single-instrument runs).
+
+The symbol table lives in a small JSON file next to the log. Because all
+records have the same width, a log is read back with :class:`numpy.memmap`
+without parsing. JournalReplayHandler feeds the recorded MARKET and SIGNAL
+events back into an engine at full speed, so that portfolio and execution
+variants can be tested against a recorded signal stream without re-running
+the strategy (use NullStrategy in its place); :meth:`JournalReader.signal_arrays`
+returns the same stream as arrays for :func:`vectorized_fills`.
+
+Multi-column bar data (``MarketEvent.bar``) is not journaled.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Deque, Iterator
+
+import numpy as np
+
+from event_back_minimal import (EVENT_NAMES, FILL, MARKET, ORDER, SIGNAL,
+                                Event, FillEvent, MarketEvent, OrderEvent,
+                                SignalEvent, _to_ns)
+
+JOURNAL_VERSION = 2  #  bump when the record layout changes
+JOURNAL_DTYPE = np.dtype([
+    ("time_ns", "<i8"),
+    ("value", "<f8"),
+    ("price", "<f8"),
+    ("cost", "<f8"),
+    ("type", "<i2"),
+    ("symbol", "<i2"),
+    ("reserved", "<i4"),
+])
+
+#  event attributes stored in the ``value``, ``price``, and ``cost`` fields
+_FIELDS = {
+    MARKET: ("price", None, "volume"),
+    SIGNAL: ("signal", None, None),
+    ORDER: ("quantity", "price", "volume"),
+    FILL: ("quantity", "price", "commission"),
+}
+
+
+def _meta_path(path: Path) -> Path:
+    """Return the path of a journal's metadata (symbol table) file."""
+    return path.with_name(path.name + ".json")
+
+
+class EventJournal:
+    """Append-only writer of a binary event log.
+
+    Parameters
+    ----------
+    path : str or Path
+        Log file; its symbol table is kept in ``<path>.json``.
+    append : bool
+        Continue an existing log instead of starting a new one; a partial
+        last record is truncated first.
+    buffer_size : int
+        Number of records collected in memory before they are written.
+    """
+
+    def __init__(self, path: str | Path, append: bool=False,
+                 buffer_size: int=65_536) -> None:
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.symbols: list[str] = []
+        if append and self.path.is_file():
+            self.symbols = JournalReader(self.path).symbols
+            #  drop a partially written last record (e.g. after a crash),
+            #  so appended records stay aligned
+            size = self.path.stat().st_size
+            os.truncate(self.path, size - size % JOURNAL_DTYPE.itemsize)
+        self._symbol_ids: dict[str | None, int] = {None: -1}
+        self._symbol_ids.update({s: j for j, s in enumerate(self.symbols)})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = self.path.open("ab" if append else "wb")
+        self._rows: list[tuple] = []
+        self.n_records = 0  #  records written by this writer
+        self._write_meta()
+
+    def _write_meta(self) -> None:
+        """Atomically rewrite the symbol table."""
+        meta = _meta_path(self.path)
+        tmp = meta.with_name(meta.name + ".tmp")
+        with tmp.open("w") as fh:
+            json.dump({"version": JOURNAL_VERSION, "symbols": self.symbols}, fh)
+        os.replace(tmp, meta)
+
+    def _symbol_id(self, symbol: str) -> int:
+        """Register a new symbol and return its index."""
+        self._symbol_ids[symbol] = len(self.symbols)
+        self.symbols.append(symbol)
+        self._write_meta()
+        return self._symbol_ids[symbol]
+
+    def wrap(self, code: int,
+             handler: Callable[[Event], None]) -> Callable[[Event], None]:
+        """Return a handler that journals each event before handling it."""
+        value_name, price_name, cost_name = _FIELDS[code]
+        rows, ids, nan = self._rows, self._symbol_ids, float("nan")
+        buffer_size = self.buffer_size
+
+        def journaled(event: Event) -> None:
+            symbol = event.symbol
+            sid = ids[symbol] if symbol in ids else self._symbol_id(symbol)
+            rows.append((
+                _to_ns(event.time_index),
+                getattr(event, value_name),
+                getattr(event, price_name) if price_name else nan,
+                getattr(event, cost_name) if cost_name else nan,
+                code,
+                sid,
+                0,
+            ))
+            if len(rows) >= buffer_size:
+                self.flush()
+            handler(event)
+
+        return journaled
+
+    def wrap_table(self, table: list[Callable[[Event], None]]
+                   ) -> list[Callable[[Event], None]]:
+        """Wrap every handler of an engine's dispatch table."""
+        return [self.wrap(code, handler) for code, handler in enumerate(table)]
+
+    def flush(self) -> None:
+        """Write all buffered records to the log."""
+        if self._rows:
+            self._fh.write(np.array(self._rows, dtype=JOURNAL_DTYPE).tobytes())
+            self.n_records += len(self._rows)
+            self._rows.clear()
+        self._fh.flush()
+
+    def close(self) -> None:
+        """Flush and close the log."""
+        if not self._fh.closed:
+            self.flush()
+            self._fh.close()
+
+    def __enter__(self) -> "EventJournal":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class JournalReader:
+    """Read-only, memory-mapped view of an event log.
+
+    A partially written last record (for example after a crash) is
+    ignored.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with _meta_path(self.path).open() as fh:
+            meta = json.load(fh)
+        if meta.get("version") != JOURNAL_VERSION:
+            raise ValueError(f"unsupported journal version in {self.path}")
+        self.symbols: list[str] = meta["symbols"]
+        n = self.path.stat().st_size // JOURNAL_DTYPE.itemsize
+        if n > 0:
+            self.records = np.memmap(self.path, dtype=JOURNAL_DTYPE, mode="r",
+                                     shape=(n,))
+        else:
+            self.records = np.empty(0, dtype=JOURNAL_DTYPE)
+
+    def __len__(self) -> int:
+        return self.records.shape[0]
+
+    def counts(self) -> dict[str, int]:
+        """Number of records per event type."""
+        codes = np.bincount(self.records["type"], minlength=len(EVENT_NAMES))
+        return {name: int(codes[code]) for code, name in enumerate(EVENT_NAMES)}
+
+    def signal_arrays(self, symbol: str | None=None
+                      ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return bar time stamps, prices, and signals (NaN if none).
+
+        The arrays describe the recorded MARKET/SIGNAL stream of one
+        symbol and can be passed to :func:`vectorized_fills`. If a bar
+        has several signals, the last one counts.
+        """
+        rec = self.records
+        sid = -1 if symbol is None else self.symbols.index(symbol)
+        rec = rec[rec["symbol"] == sid]
+        market = rec["type"] == MARKET
+        bar_of = np.cumsum(market) - 1  #  bar to which each record belongs
+        signals = np.full(int(market.sum()), np.nan)
+        is_signal = (rec["type"] == SIGNAL) & (bar_of >= 0)
+        signals[bar_of[is_signal]] = rec["value"][is_signal]
+        return rec["time_ns"][market], rec["value"][market], signals
+
+
+class JournalReplayHandler:
+    """Feeds recorded events from a journal back into an engine.
+
+    Every call of :meth:`update_bars` pushes one recorded MarketEvent
+    together with the events of ``types`` recorded after it (by default
+    the SIGNALs of that bar), reproducing the original queue order.
+    Records are converted chunk by chunk, so logs larger than RAM can be
+    replayed.
+    """
+
+    def __init__(self, path: str | Path, types: tuple[int, ...]=(MARKET, SIGNAL),
+                 chunksize: int=262_144) -> None:
+        self.reader = JournalReader(path)
+        self.symbols: list[str | None] = [*self.reader.symbols, None]  #  -1 -> None
+        self.types = tuple(sorted(set(types) | {MARKET}))
+        self._chunks = self._iter_chunks(chunksize)
+        self._rows: list[tuple] = []
+        self._cursor = 0
+        self.continue_backtest = True
+
+    def __len__(self) -> int:
+        """Number of recorded bars."""
+        return int(np.count_nonzero(self.reader.records["type"] == MARKET))
+
+    def _iter_chunks(self, chunksize: int) -> Iterator[list[tuple]]:
+        """Yield lists of records, each ending just before a MarketEvent."""
+        rec = self.reader.records
+        start, n = 0, rec.shape[0]
+        while start < n:
+            stop = min(start + chunksize, n)
+            block = rec[start:stop]
+            if stop < n:
+                markets = np.flatnonzero(block["type"] == MARKET)
+                if markets.shape[0] > 0 and markets[-1] > 0:
+                    stop = start + int(markets[-1])  #  keep each bar together
+                    block = rec[start:stop]
+            block = block[np.isin(block["type"], self.types)]
+            yield list(zip(block["type"].tolist(), block["time_ns"].tolist(),
+                           block["value"].tolist(), block["price"].tolist(),
+                           block["cost"].tolist(), block["symbol"].tolist()))
+            start = stop
+
+    def _event(self, row: tuple) -> Event:
+        """Rebuild an event from a record."""
+        code, time_ns, value, price, cost, sid = row
+        symbol = self.symbols[sid]
+        if code == MARKET:
+            return MarketEvent(time_ns, value, None, symbol, cost)
+        if code == SIGNAL:
+            return SignalEvent(time_ns, value, symbol)
+        if code == ORDER:
+            return OrderEvent(time_ns, value, symbol, price, cost)
+        return FillEvent(time_ns, value, price, symbol, cost)
+
+    def update_bars(self, events: Deque[Event]) -> None:
+        """Push the next recorded bar and its follow-up events."""
+        rows, i = self._rows, self._cursor
+        while i == len(rows):
+            try:
+                rows = self._rows = next(self._chunks)
+            except StopIteration:
+                self.continue_backtest = False
+                return
+            i = 0
+        events.append(self._event(rows[i]))
+        i += 1
+        while i < len(rows) and rows[i][0] != MARKET:
+            events.append(self._event(rows[i]))
+            i += 1
+        self._cursor = i
+
+
+class NullStrategy:
+    """Strategy placeholder that never emits signals (journal replays)."""
+
+    def on_market_event(self, event: MarketEvent, events: Deque[Event]) -> None:
+        """Ignore the bar; recorded signals arrive from the journal."""
+
+
+if __name__ == "__main__":
+    import time
+
+    from event_back_minimal import (BacktestEngine, CSVDataHandler,
+                                    NaiveExecutionHandler, SimpleMomentumStrategy,
+                                    SimplePortfolio, vectorized_fills)
+
+    path = Path("data/.journal/event_back_minimal.bin")
+    portfolio = SimplePortfolio(capacity=0)
+    engine = BacktestEngine(CSVDataHandler(), SimpleMomentumStrategy(),
+                            portfolio, NaiveExecutionHandler())
+    with EventJournal(path) as journal:
+        t0 = time.perf_counter()
+        engine.run(journal=journal)
+        t_record = time.perf_counter() - t0
+    reader = JournalReader(path)
+
+    replayed = SimplePortfolio(capacity=0)
+    replay = BacktestEngine(JournalReplayHandler(path), NullStrategy(),
+                            replayed, NaiveExecutionHandler())
+    t0 = time.perf_counter()
+    replay.run()
+    t_replay = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    _, prices, signals = reader.signal_arrays()
+    bulk = vectorized_fills(prices, signals)
+    t_bulk = time.perf_counter() - t0
+
+    original = portfolio.history()["equity"].to_numpy()
+    assert np.array_equal(original, replayed.history()["equity"].to_numpy())
+    assert np.array_equal(original, bulk["equity"])
+    print("Event journal for the EURUSD momentum backtest")
+    print(f"  file={path} ({path.stat().st_size} bytes, "
+          f"{JOURNAL_DTYPE.itemsize} bytes per record)")
+    print(f"  records={len(reader)} {reader.counts()}\n")
+    print(f"  record run (strategy + journal) = {t_record * 1e3:7.2f} ms")
+    print(f"  event replay (no strategy)      = {t_replay * 1e3:7.2f} ms")
+    print(f"  vectorized replay               = {t_bulk * 1e3:7.2f} ms")
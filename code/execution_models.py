@@ -0,0 +1,354 @@
+"""
+Execution models with transaction costs for the event-based backtester.
+
+NaiveExecutionHandler fills every order at the latest price without costs.
+The models below add costs and come with two implementations that use the
+same floating-point operations:
+
+- ``fill(quantity, price, volume)`` returns the fill price and commission
+  of one order and is used by ModelExecutionHandler inside the event loop
+  (with the bar volume carried by the OrderEvent), and
+- ``fill_arrays(quantity, price, volume)`` does the same for whole arrays
+  and is used by the vectorized engine path (:func:`vectorized_fills`), so
+  cost-aware event backtests and their vectorized runs agree exactly.
+
+``turnover_costs(turnover)`` expresses a model's costs in return units for
+backtests that hold positions as fractions of equity. For ProportionalCost
+it is the ``cost * turnover`` term of :func:`vecback_lag_ols.run_forecast_strategy`.
+
+Models:
+
+- ProportionalCost: commission in basis points of the traded notional,
+  with presets for the asset classes in data/transcosts.md,
+- SpreadCost: fills at the far side of a bid-ask spread (half the spread
+  against the order), and
+- VolumeSlippage: square-root market impact, growing with the order's
+  share of the bar volume.
+
+Models can be chained with CombinedModel.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Deque
+
+import numpy as np
+
+from event_back_minimal import Event, FillEvent, OrderEvent
+
+#  Typical round-trip costs in bps (low, high) from data/transcosts.md.
+ASSET_CLASS_BPS = {
+    "fx_major": (2.0, 5.0),
+    "fx_minor": (8.0, 30.0),
+    "us_large_cap": (5.0, 15.0),
+    "global_equities": (6.0, 20.0),
+    "index_futures": (1.0, 3.0),
+    "commodity_futures": (15.0, 25.0),
+    "equity_etf": (1.0, 10.0),
+    "bond_etf": (10.0, 30.0),
+    "commodity_etf": (25.0, 50.0),
+}
+
+#  Asset class of the instruments in data/epat_eod.csv (no entry for crypto).
+SYMBOL_ASSET_CLASS = {
+    "AAPL": "us_large_cap",
+    "NVDA": "us_large_cap",
+    "JPM": "us_large_cap",
+    "SPY": "equity_etf",
+    "GLD": "commodity_etf",
+    "TLT": "bond_etf",
+    "EURUSD": "fx_major",
+}
+
+
+class ExecutionModel:
+    """Fills at the reference price without costs (base class)."""
+
+    def fill(self, quantity: float, price: float,
+             volume: float=math.nan) -> tuple[float, float]:
+        """Return fill price and commission of one order."""
+        return price, 0.0
+
+    def fill_arrays(self, quantity: np.ndarray, price: np.ndarray,
+                    volume: np.ndarray | None=None) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorized :meth:`fill` for arrays of orders."""
+        return np.asarray(price, dtype=float), np.zeros(np.shape(quantity))
+
+    def turnover_costs(self, turnover: np.ndarray,
+                       volume: np.ndarray | None=None) -> np.ndarray:
+        """Costs in return units of position changes in fractions of equity."""
+        return np.zeros(np.shape(turnover))
+
+
+class ProportionalCost(ExecutionModel):
+    """Commission proportional to traded notional.
+
+    Parameters
+    ----------
+    bps : float
+        Cost per unit of traded notional in basis points (one way).
+    """
+
+    def __init__(self, bps: float) -> None:
+        self.bps = bps
+        self.rate = bps / 1e4  #  fraction of notional
+
+    @classmethod
+    def for_asset_class(cls, asset_class: str,
+                        level: str="mid") -> "ProportionalCost":
+        """Preset from data/transcosts.md (``level``: low, mid, or high).
+
+        The table lists round-trip costs, so half of them is charged on
+        every trade.
+        """
+        low, high = ASSET_CLASS_BPS[asset_class]
+        round_trip = {"low": low, "mid": (low + high) / 2.0, "high": high}[level]
+        return cls(round_trip / 2.0)
+
+    @classmethod
+    def for_symbol(cls, symbol: str, level: str="mid") -> "ProportionalCost":
+        """Preset for an instrument of data/epat_eod.csv."""
+        try:
+            asset_class = SYMBOL_ASSET_CLASS[symbol]
+        except KeyError:
+            raise KeyError(f"no asset class known for {symbol!r}") from None
+        return cls.for_asset_class(asset_class, level)
+
+    def fill(self, quantity: float, price: float,
+             volume: float=math.nan) -> tuple[float, float]:
+        return price, abs(quantity) * price * self.rate
+
+    def fill_arrays(self, quantity: np.ndarray, price: np.ndarray,
+                    volume: np.ndarray | None=None) -> tuple[np.ndarray, np.ndarray]:
+        price = np.asarray(price, dtype=float)
+        return price, np.abs(quantity) * price * self.rate
+
+    def turnover_costs(self, turnover: np.ndarray,
+                       volume: np.ndarray | None=None) -> np.ndarray:
+        return self.rate * turnover
+
+
+class SpreadCost(ExecutionModel):
+    """Buys at the ask and sells at the bid around the reference price.
+
+    Parameters
+    ----------
+    spread_bps : float
+        Full bid-ask spread in basis points of the price.
+    """
+
+    def __init__(self, spread_bps: float) -> None:
+        self.spread_bps = spread_bps
+        self.half_spread = spread_bps / 2e4
+
+    def fill(self, quantity: float, price: float,
+             volume: float=math.nan) -> tuple[float, float]:
+        if quantity > 0.0:
+            return price * (1.0 + self.half_spread), 0.0
+        if quantity < 0.0:
+            return price * (1.0 - self.half_spread), 0.0
+        return price, 0.0
+
+    def fill_arrays(self, quantity: np.ndarray, price: np.ndarray,
+                    volume: np.ndarray | None=None) -> tuple[np.ndarray, np.ndarray]:
+        price = np.asarray(price, dtype=float)
+        fill_price = np.where(quantity > 0.0, price * (1.0 + self.half_spread),
+                              np.where(quantity < 0.0,
+                                       price * (1.0 - self.half_spread), price))
+        return fill_price, np.zeros(np.shape(quantity))
+
+    def turnover_costs(self, turnover: np.ndarray,
+                       volume: np.ndarray | None=None) -> np.ndarray:
+        return self.half_spread * turnover
+
+
+class VolumeSlippage(ExecutionModel):
+    """Square-root market impact relative to bar volume.
+
+    An order of ``q`` units moves its fill price against the order by
+    ``impact_bps * sqrt(|q| / volume)`` basis points.
+
+    Parameters
+    ----------
+    impact_bps : float
+        Impact of an order as large as the bar volume, in basis points.
+    volume : float
+        Bar volume (in units) used when none is passed per order, and for
+        bars whose volume is missing (NaN) or not positive.
+    """
+
+    def __init__(self, impact_bps: float=10.0, volume: float=1e6) -> None:
+        self.impact_bps = impact_bps
+        self.impact = impact_bps / 1e4
+        self.volume = volume
+
+    def fill(self, quantity: float, price: float,
+             volume: float=math.nan) -> tuple[float, float]:
+        if math.isnan(volume) or volume <= 0.0:  #  use the default bar volume
+            volume = self.volume
+        slip = self.impact * math.sqrt(abs(quantity) / volume)
+        if quantity > 0.0:
+            return price * (1.0 + slip), 0.0
+        if quantity < 0.0:
+            return price * (1.0 - slip), 0.0
+        return price, 0.0
+
+    def fill_arrays(self, quantity: np.ndarray, price: np.ndarray,
+                    volume: np.ndarray | None=None) -> tuple[np.ndarray, np.ndarray]:
+        price = np.asarray(price, dtype=float)
+        if volume is None:
+            volume = self.volume
+        else:  #  NaN or non-positive entries: default volume, as in :meth:`fill`
+            volume = np.asarray(volume, dtype=float)
+            volume = np.where(volume > 0.0, volume, self.volume)
+        slip = self.impact * np.sqrt(np.abs(quantity) / volume)
+        fill_price = np.where(quantity > 0.0, price * (1.0 + slip),
+                              np.where(quantity < 0.0, price * (1.0 - slip), price))
+        return fill_price, np.zeros(np.shape(quantity))
+
+    def turnover_costs(self, turnover: np.ndarray,
+                       volume: np.ndarray | None=None) -> np.ndarray:
+        """Impact costs; ``volume`` is measured in the units of ``turnover``."""
+        if volume is None:
+            volume = self.volume
+        else:
+            volume = np.asarray(volume, dtype=float)
+            volume = np.where(volume > 0.0, volume, self.volume)
+        return turnover * (self.impact * np.sqrt(turnover / volume))
+
+
+class CombinedModel(ExecutionModel):
+    """Applies several models in turn (prices chain, commissions add up)."""
+
+    def __init__(self, *models: ExecutionModel) -> None:
+        self.models = models
+
+    def fill(self, quantity: float, price: float,
+             volume: float=math.nan) -> tuple[float, float]:
+        commission = 0.0
+        for model in self.models:
+            price, cost = model.fill(quantity, price, volume)
+            commission += cost
+        return price, commission
+
+    def fill_arrays(self, quantity: np.ndarray, price: np.ndarray,
+                    volume: np.ndarray | None=None) -> tuple[np.ndarray, np.ndarray]:
+        commission = np.zeros(np.shape(quantity))
+        for model in self.models:
+            price, cost = model.fill_arrays(quantity, price, volume)
+            commission = commission + cost
+        return price, commission
+
+    def turnover_costs(self, turnover: np.ndarray,
+                       volume: np.ndarray | None=None) -> np.ndarray:
+        costs = np.zeros(np.shape(turnover))
+        for model in self.models:
+            costs = costs + model.turnover_costs(turnover, volume)
+        return costs
+
+
+class ModelExecutionHandler:
+    """Fills orders at their reference price through an execution model.
+
+    Drop-in replacement for NaiveExecutionHandler; BacktestEngine uses
+    ``model`` for its vectorized modes as well.
+    """
+
+    def __init__(self, model: ExecutionModel) -> None:
+        self.model = model
+
+    def on_order_event(self, event: OrderEvent, events: Deque[Event]) -> None:
+        """Convert an OrderEvent into a FillEvent with price and commission."""
+        price, commission = self.model.fill(event.quantity, event.price, event.volume)
+        events.append(FillEvent(event.time_index, event.quantity, price,
+                                event.symbol, commission))
+
+
+if __name__ == "__main__":
+    import pandas as pd
+
+    from event_back_minimal import (ArrayDataHandler, BacktestEngine,
+                                    CSVDataHandler, SimpleMomentumStrategy,
+                                    SimplePortfolio)
+    from vecback_lag_ols import (fit_ols, lag_matrix, load_prices,
+                                 run_forecast_strategy, run_lag_strategy)
+
+    # 1) event backtest vs vectorized fast path, for every model
+    eurusd = ProportionalCost.for_symbol("EURUSD")
+    models = {
+        "none": ExecutionModel(),
+        f"proportional ({eurusd.bps:g} bps)": eurusd,
+        "spread (2 bps)": SpreadCost(2.0),
+        "volume slippage": VolumeSlippage(impact_bps=10.0, volume=100.0),
+        "combined": CombinedModel(eurusd, SpreadCost(2.0)),
+    }
+    rows = {}
+    for name, model in models.items():
+        engines = {}
+        for mode in ("event", "vectorized"):
+            engines[mode] = BacktestEngine(
+                CSVDataHandler(), SimpleMomentumStrategy(),
+                SimplePortfolio(capacity=0), ModelExecutionHandler(model))
+            engines[mode].run(mode)
+        eq_event = engines["event"].portfolio.history()["equity"].to_numpy()
+        eq_vec = engines["vectorized"].portfolio.history()["equity"].to_numpy()
+        rows[name] = {"final_equity": eq_event[-1],
+                      "identical": bool(np.array_equal(eq_event, eq_vec))}
+
+    print("Event-based EURUSD momentum backtest with execution models")
+    print(pd.DataFrame(rows).T.to_string())
+
+    # 2) per-bar volumes reach VolumeSlippage in both engine paths
+    prices = CSVDataHandler().prices
+    rng = np.random.default_rng(seed=7)
+    bar_volume = 100.0 * rng.lognormal(0.0, 1.0, size=len(prices))
+    bars = np.column_stack([prices.to_numpy(), bar_volume])
+    slippage = VolumeSlippage(impact_bps=10.0, volume=100.0)
+    final = {}
+    for label, volume_column in (("constant volume", None), ("bar volume", 1)):
+        curves = []
+        for mode in ("event", "vectorized"):
+            engine = BacktestEngine(
+                ArrayDataHandler.from_arrays(prices.index.to_numpy(), bars,
+                                             ["price", "volume"],
+                                             volume_column=volume_column),
+                SimpleMomentumStrategy(), SimplePortfolio(capacity=0),
+                ModelExecutionHandler(slippage))
+            engine.run(mode)
+            curves.append(engine.portfolio.history()["equity"].to_numpy())
+        assert np.array_equal(curves[0], curves[1])
+        final[label] = curves[0][-1]
+    assert final["constant volume"] != final["bar volume"]
+    #  bars without a usable volume fall back to the default in both paths
+    qty = np.array([3.0, -3.0, 3.0, 3.0])
+    vol = np.array([0.0, -5.0, np.nan, 50.0])
+    fills = slippage.fill_arrays(qty, np.full(4, 1.1), vol)[0]
+    assert np.array_equal(fills, [slippage.fill(q, 1.1, v)[0] for q, v in zip(qty, vol)])
+    assert fills[0] == slippage.fill(3.0, 1.1)[0] and fills[1] == slippage.fill(-3.0, 1.1)[0]
+    print("\nVolumeSlippage with per-bar volumes (event and vectorized identical):")
+    for label, value in final.items():
+        print(f"  {label:16s} final equity = {value:.6f}")
+
+    # 3) return-space costs vs run_lag_strategy
+    prices = load_prices("data/epat_eod.csv", "EURUSD")
+    rets = np.diff(np.log(prices.to_numpy()))
+    X, y = lag_matrix(rets, 7), rets[7:]
+    beta = fit_ols(X, y)
+    y_pred = beta[0] + X @ beta[1:]
+    pos = np.nan_to_num(np.sign(y_pred))
+    turnover = np.abs(pos[1:] - pos[:-1])
+    for bps in (0.0, 1.0, 2.0, 5.0):
+        model = ProportionalCost(bps)
+        strat = pos * y
+        strat[1:] = strat[1:] - model.turnover_costs(turnover)
+        ref = run_lag_strategy(X, y, beta, cost=bps / 1e4)
+        assert np.array_equal(strat, ref)
+        assert np.array_equal(run_forecast_strategy(y_pred, y, model=model), ref)
+    print("\nProportionalCost.turnover_costs reproduces run_lag_strategy exactly "
+          "(0, 1, 2, 5 bps)")
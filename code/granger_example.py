@@ -10,6 +10,8 @@ https://hilpisch.com | https://linktr.ee/dyjh
 import numpy as np
 import matplotlib.pyplot as plt
 
+from simulation import simulate_var
+
 plt.style.use("seaborn-v0_8")
 
 
@@ -24,16 +26,12 @@ def simulate_coupled_returns(
     eps_x = rng.normal(0.0, sigma, size=steps)  #  innovation shocks for X
     eps_y = rng.normal(0.0, sigma, size=steps)  #  innovation shocks for Y
 
-    x = np.empty(steps)  #  allocate array for X returns
-    y = np.empty(steps)  #  allocate array for Y returns
-    x[0] = eps_x[0]  #  initialize X with first shock
-    y[0] = eps_y[0]  #  initialize Y with first shock
-
-    for t in range(1, steps):
-        x[t] = rho_x * x[t - 1] + eps_x[t]  #  AR(1) recursion for X
-        y[t] = beta_xy * x[t - 1] + eps_y[t]  #  X drives Y with one lag
-
-    return x, y
+    coefs = np.array([
+        [rho_x, 0.0],  #  AR(1) recursion for X
+        [beta_xy, 0.0],  #  X drives Y with one lag
+    ])
+    r = simulate_var(coefs, eps=np.column_stack([eps_x, eps_y]))
+    return r[:, 0], r[:, 1]
 
 
 def simple_granger_regression(x: np.ndarray, y: np.ndarray) -> tuple[float, float]:
@@ -0,0 +1,230 @@
+"""
+Parallel, resumable grid search over lag-OLS backtest configurations.
+
+Each configuration is a (column, lags, cost, train_window) tuple:
+
+- ``train_window=None`` fits the model once on the full sample, which
+  reproduces :class:`vecback_lag_ols_oop.LagOLSBacktest`, and
+- an integer ``train_window`` uses rolling walk-forward fits on the last
+  ``train_window`` returns before every date (out-of-sample forecasts);
+  the first ``train_window`` dates have no forecast and are not scored.
+
+Configurations are grouped by (column, lags, train_window), so every fit
+is shared by all cost levels, and the groups are spread over a
+ProcessPoolExecutor. Workers do not receive price data through pickling:
+each one opens the memory-mapped panel store of :mod:`price_store` once,
+so all processes share a single copy in the page cache. Finished results
+are appended to a JSON-lines cache file keyed by configuration and data
+hash, so an interrupted sweep resumes where it stopped. A group that
+fails does not stop the others; its configurations are reported in the
+``error`` column and retried on the next run.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from price_store import PricePanel, open_panel
+from vecback_lag_ols import (fit_ols, lag_matrix, run_forecast_strategy,
+                             walk_forward_forecasts)
+from vecback_lag_ols_oop import SWEEP_METRICS, sweep_metrics
+
+CACHE_PATH = "data/.grid_cache/lag_grid_search.jsonl"
+CACHE_VERSION = 2  #  bump when cached metrics change meaning
+
+_PANEL: PricePanel | None = None  #  per-worker handle on the shared store
+
+
+@dataclass(frozen=True)
+class GridConfig:
+    """One backtest configuration of the grid."""
+
+    column: str  #  instrument to trade
+    lags: int  #  number of lagged returns in the regression
+    cost: float  #  proportional transaction cost per unit turnover
+    train_window: int | None = None  #  None: full-sample fit
+
+
+def make_grid(columns: Iterable[str], lags: Iterable[int],
+              costs: Iterable[float],
+              train_windows: Iterable[int | None]=(None,)) -> list[GridConfig]:
+    """Return the Cartesian product of all parameter values."""
+    return [
+        GridConfig(col, int(k), float(c), w)
+        for col, k, c, w in itertools.product(columns, lags, costs, train_windows)
+    ]
+
+
+def _cache_key(config: GridConfig, data_hash: str | None) -> str:
+    """Serialize a configuration (plus data hash) into a cache key."""
+    return json.dumps([CACHE_VERSION, data_hash, config.column, config.lags,
+                       config.cost, config.train_window])
+
+
+def _load_cache(cache_path: Path) -> dict[str, dict]:
+    """Read all complete records from the JSON-lines cache file."""
+    results: dict[str, dict] = {}
+    if not cache_path.is_file():
+        return results
+    with cache_path.open() as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:  #  partially written last line
+                continue
+            results[record.pop("key")] = record
+    return results
+
+
+def _init_worker(csv_path: str) -> None:
+    """Attach a worker process to the memory-mapped price store."""
+    global _PANEL
+    _PANEL = open_panel(csv_path)
+
+
+def _run_group(column: str, lags: int, train_window: int | None,
+               costs: list[float]) -> list[dict]:
+    """Backtest one (column, lags, train_window) group for all its costs."""
+    assert _PANEL is not None
+    prices = _PANEL.values(column)  #  zero-copy view into the store
+    rets = np.diff(np.log(prices))
+    if rets.shape[0] <= lags:
+        raise ValueError(f"not enough observations for {column} with {lags} lags")
+    X = lag_matrix(rets, lags)
+    y = rets[lags:]
+    if train_window is None:
+        beta = fit_ols(X, y)
+        y_pred = beta[0] + X @ beta[1:]
+    else:
+        if y.shape[0] <= train_window:
+            raise ValueError(f"not enough observations for {column} with "
+                             f"train_window={train_window}")
+        y_pred = walk_forward_forecasts(X, y, window=train_window)
+        #  score out-of-sample dates only, not the burn-in without forecasts
+        y_pred, y = y_pred[train_window:], y[train_window:]
+    strat = np.column_stack([run_forecast_strategy(y_pred, y, c) for c in costs])
+    metrics = sweep_metrics(strat)
+    return [
+        {name: float(val[j]) for name, val in metrics.items()}
+        for j in range(len(costs))
+    ]
+
+
+def run_grid_search(configs: Iterable[GridConfig],
+                    csv_path: str="data/epat_eod.csv",
+                    cache_path: str | Path | None=CACHE_PATH,
+                    max_workers: int | None=None) -> pd.DataFrame:
+    """Evaluate all configurations in a process pool and return a tidy frame.
+
+    Parameters
+    ----------
+    configs : iterable of GridConfig
+        Configurations to evaluate; duplicates are evaluated once.
+    csv_path : str
+        Price CSV file; its memory-mapped store is built if necessary.
+    cache_path : str or Path, optional
+        JSON-lines file with already computed results. Results are
+        appended as soon as a group finishes. ``None`` disables caching.
+    max_workers : int, optional
+        Number of worker processes (default: all CPUs).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per configuration with its metrics. Configurations of a
+        group that raised have NaN metrics and the exception in ``error``
+        (None otherwise); they are not cached.
+    """
+    configs = list(dict.fromkeys(configs))
+    data_hash = open_panel(csv_path).source_hash  #  builds the store once
+    cache_file = Path(cache_path) if cache_path is not None else None
+    done = _load_cache(cache_file) if cache_file is not None else {}
+
+    errors: dict[str, str] = {}
+    groups: dict[tuple, list[GridConfig]] = {}
+    for config in configs:
+        if _cache_key(config, data_hash) not in done:
+            key = (config.column, config.lags, config.train_window)
+            groups.setdefault(key, []).append(config)
+
+    if groups:
+        out = None
+        if cache_file is not None:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            torn = False
+            if cache_file.is_file() and cache_file.stat().st_size > 0:
+                with cache_file.open("rb") as fh:
+                    fh.seek(-1, os.SEEK_END)
+                    torn = fh.read(1) != b"\n"
+            out = cache_file.open("a")
+            if torn:  #  end a partially written last line before appending
+                out.write("\n")
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers,
+                                     initializer=_init_worker,
+                                     initargs=(csv_path,)) as pool:
+                futures = {
+                    pool.submit(_run_group, *key, [c.cost for c in group]): group
+                    for key, group in groups.items()
+                }
+                for future in as_completed(futures):
+                    try:
+                        group_metrics = future.result()
+                    except Exception as exc:  #  keep the other groups' results
+                        for config in futures[future]:
+                            errors[_cache_key(config, data_hash)] = repr(exc)
+                        continue
+                    for config, metrics in zip(futures[future], group_metrics):
+                        key = _cache_key(config, data_hash)
+                        done[key] = {**asdict(config), **metrics}
+                        if out is not None:
+                            out.write(json.dumps({"key": key, **done[key]}) + "\n")
+                    if out is not None:
+                        out.flush()  #  persist progress group by group
+        finally:
+            if out is not None:
+                out.close()
+
+    keys = [_cache_key(c, data_hash) for c in configs]
+    columns = [*GridConfig.__dataclass_fields__, *SWEEP_METRICS]
+    results = pd.DataFrame([done.get(key) or asdict(c) for key, c in zip(keys, configs)],
+                           columns=columns)
+    results["train_window"] = results["train_window"].astype("Int64")  #  keeps None
+    results["error"] = [errors.get(key) for key in keys]
+    return results
+
+
+if __name__ == "__main__":
+    import time
+
+    grid = make_grid(
+        columns=["AAPL", "SPY", "GLD", "EURUSD", "BTC-USD"],
+        lags=range(1, 11),
+        costs=(0.0, 0.0001, 0.0005, 0.001),
+        train_windows=(None, 252, 504),
+    )
+    t0 = time.perf_counter()
+    results = run_grid_search(grid, max_workers=os.cpu_count())
+    elapsed = time.perf_counter() - t0
+
+    print("Lag-OLS grid search")
+    print(f"  configurations={len(grid)}, wall time={elapsed:.2f} s "
+          f"(cached results are reused on the next run)\n")
+    oos = results[results["train_window"].notna()]
+    best = oos.sort_values("sharpe", ascending=False).head(10)
+    print("Best walk-forward configurations by Sharpe ratio")
+    print(best.round(4).to_string(index=False))
@@ -0,0 +1,306 @@
+"""
+Memory-mapped columnar cache for the end-of-day price CSV files.
+
+Parsing data/epat_eod.csv with pandas.read_csv (including date parsing)
+dominates the start-up time of short backtests. The helpers below convert
+a CSV file once into a small panel store and reuse it on every later call:
+
+- ``dates.npy`` holds the shared datetime64 index of all rows,
+- ``values.f8`` holds the valid (non-NaN) prices of every symbol as one
+  contiguous float64 block per symbol, and
+- ``positions.i8`` holds, in the same layout, the row of each price in
+  the shared index.
+
+Both binary files are opened with :class:`numpy.memmap`, so selecting a
+single symbol returns a read-only view instead of a copy, and several
+worker processes reading the same store share one copy in the page cache.
+Every build writes its arrays under new, unique file names and then
+publishes them by atomically replacing ``meta.json``, which names the
+files; readers therefore never see a half-written store or a mix of two
+builds, even while another process rebuilds it.
+The cache is keyed by the file's modification time and size and, if these
+change, by a content hash, so edits to the CSV file invalidate it
+automatically.
+
+(c) Dr. Yves J. Hilpisch
+AI-Powered by GPT 5.1
+The Python Quants GmbH | https://tpq.io
+https://hilpisch.com | https://linktr.ee/dyjh
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = ".price_cache"  #  cache folder created next to the CSV file
+CACHE_VERSION = 3  #  bump when the on-disk layout changes
+
+
+def _file_hash(path: Path, block_size: int=1 << 20) -> str:
+    """Return the BLAKE2b content hash of a file."""
+    digest = hashlib.blake2b(digest_size=16)
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_path(csv_path: Path) -> Path:
+    """Return the cache directory used for a given CSV file."""
+    return csv_path.parent / CACHE_DIR / csv_path.name
+
+
+def _is_remote(src: str | Path) -> bool:
+    """Check whether a data source is a URL rather than a local path."""
+    return str(src).startswith(("http://", "https://"))
+
+
+def _read_meta(cache: Path) -> dict | None:
+    """Read cache metadata, returning None if it is missing or unreadable."""
+    try:
+        with (cache / "meta.json").open() as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if meta.get("version") != CACHE_VERSION:
+        return None
+    return meta
+
+
+def _unique_token() -> str:
+    """Return a file name token unique across processes and calls."""
+    return f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+
+
+def _write_meta(cache: Path, meta: dict) -> None:
+    """Atomically replace the cache metadata file."""
+    tmp = cache / f"meta.json.{_unique_token()}.tmp"
+    with tmp.open("w") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, cache / "meta.json")
+
+
+def write_panel(df: pd.DataFrame, cache: Path, key: dict | None=None) -> Path:
+    """Write a date-indexed price DataFrame as a panel store.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Prices with a DatetimeIndex and one column per symbol.
+    cache : Path
+        Target directory of the store.
+    key : dict, optional
+        Source fingerprint (mtime, size, hash) stored with the metadata.
+    """
+    cache.mkdir(parents=True, exist_ok=True)
+    token = _unique_token()  #  files of this build, unseen until published
+    files = {"dates": f"dates.{token}.npy", "values": f"values.{token}.f8",
+             "positions": f"positions.{token}.i8"}
+    np.save(cache / files["dates"], df.index.to_numpy())
+
+    raw = df.to_numpy(dtype=float)
+    valid = ~np.isnan(raw)
+    counts = valid.sum(axis=0)
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    #  column-major compaction keeps each symbol contiguous on disk
+    values = raw.T[valid.T]
+    positions = np.nonzero(valid.T)[1].astype(np.int64)
+    values.tofile(cache / files["values"])
+    positions.tofile(cache / files["positions"])
+
+    meta = {"version": CACHE_VERSION, **(key or {})}
+    meta.update(
+        index_name=df.index.name,
+        columns=[str(col) for col in df.columns],
+        offsets=[int(o) for o in offsets],
+        files=files,
+    )
+    previous = _read_meta(cache)
+    _write_meta(cache, meta)  #  written last: publishes the complete store
+    if previous is not None:
+        #  existing memory maps of the old files stay valid after unlinking
+        for name in set(previous["files"].values()) - set(files.values()):
+            try:
+                (cache / name).unlink()
+            except OSError:  #  already removed, or still mapped on Windows
+                pass
+    return cache
+
+
+def build_cache(csv_path: str | Path) -> Path:
+    """Parse a price CSV file and write its panel store."""
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    df = pd.read_csv(csv_path, parse_dates=["Date"]).set_index("Date")
+    key = {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "hash": _file_hash(csv_path),
+    }
+    return write_panel(df, _cache_path(csv_path), key)
+
+
+def ensure_cache(csv_path: str | Path) -> Path:
+    """Return an up-to-date cache directory for a CSV file.
+
+    A matching modification time and size is taken as proof that the
+    cache is current. Otherwise the content hash decides whether the
+    file really changed (rebuild) or was merely touched (refresh key).
+    """
+    csv_path = Path(csv_path)
+    stat = csv_path.stat()
+    cache = _cache_path(csv_path)
+    meta = _read_meta(cache)
+    if meta is None or "hash" not in meta:
+        return build_cache(csv_path)
+    if meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+        return cache
+    if meta["size"] == stat.st_size and meta["hash"] == _file_hash(csv_path):
+        meta["mtime_ns"] = stat.st_mtime_ns  #  touched but unchanged
+        _write_meta(cache, meta)
+        return cache
+    return build_cache(csv_path)
+
+
+class PricePanel:
+    """Read-only, memory-mapped view of a panel store.
+
+    Parameters
+    ----------
+    cache : Path
+        Directory written by :func:`write_panel`.
+    """
+
+    def __init__(self, cache: Path) -> None:
+        self.cache = cache
+        for attempt in range(3):
+            meta = _read_meta(cache)
+            if meta is None:
+                raise FileNotFoundError(f"no valid price store in {cache}")
+            try:
+                self._open(meta)
+                break
+            except FileNotFoundError:  #  replaced by a concurrent rebuild
+                if attempt == 2:
+                    raise
+
+    def _open(self, meta: dict) -> None:
+        """Memory-map the files of the build described by ``meta``."""
+        cache, files = self.cache, meta["files"]
+        self.columns: list[str] = meta["columns"]
+        self.offsets = np.asarray(meta["offsets"], dtype=np.int64)
+        self.index_name = meta["index_name"]
+        self.source_hash: str | None = meta.get("hash")  #  content hash of the CSV
+        self.dates = np.load(cache / files["dates"], mmap_mode="r")  #  shared index
+        n_obs = int(self.offsets[-1])
+        if n_obs > 0:
+            self._values = np.memmap(cache / files["values"], dtype=np.float64,
+                                     mode="r", shape=(n_obs,))
+            self._positions = np.memmap(cache / files["positions"], dtype=np.int64,
+                                        mode="r", shape=(n_obs,))
+        else:
+            self._values = np.empty(0)
+            self._positions = np.empty(0, dtype=np.int64)
+
+    def _slice(self, column: str) -> slice:
+        """Return the slice of a symbol's block in the flat value file."""
+        try:
+            j = self.columns.index(column)
+        except ValueError:
+            raise KeyError(column) from None
+        return slice(int(self.offsets[j]), int(self.offsets[j + 1]))
+
+    def values(self, column: str) -> np.ndarray:
+        """Return the valid prices of one symbol as a zero-copy view."""
+        return self._values[self._slice(column)]
+
+    def positions(self, column: str) -> np.ndarray:
+        """Return the rows in :attr:`dates` of one symbol's prices."""
+        return self._positions[self._slice(column)]
+
+    def series(self, column: str) -> pd.Series:
+        """Return one symbol as a Series backed by the memory map.
+
+        Only the date index is materialized; the price values are a
+        read-only view, equivalent to ``frame()[column].dropna()``.
+        """
+        pos = self.positions(column)
+        if pos.shape[0] > 0 and pos[-1] - pos[0] + 1 == pos.shape[0]:
+            dates = self.dates[pos[0]:pos[-1] + 1]  #  gap-free block
+        else:
+            dates = self.dates[pos]
+        index = pd.DatetimeIndex(dates, name=self.index_name)
+        return pd.Series(self.values(column), index=index, name=column, copy=False)
+
+    def frame(self, columns: list[str] | None=None) -> pd.DataFrame:
+        """Materialize a dense DataFrame (NaN where a symbol has no price)."""
+        columns = self.columns if columns is None else list(columns)
+        dense = np.full((self.dates.shape[0], len(columns)), np.nan)
+        for j, col in enumerate(columns):
+            dense[self.positions(col), j] = self.values(col)
+        index = pd.DatetimeIndex(np.asarray(self.dates), name=self.index_name)
+        return pd.DataFrame(dense, index=index, columns=columns)
+
+
+def open_panel(csv_path: str | Path) -> PricePanel:
+    """Open (building or refreshing if needed) the panel store of a CSV file."""
+    return PricePanel(ensure_cache(csv_path))
+
+
+def read_price_csv(src: str | Path) -> pd.DataFrame:
+    """Load a price CSV as a float DataFrame indexed by date.
+
+    Equivalent to ``pd.read_csv(src, parse_dates=["Date"]).set_index("Date")``
+    for the EPAT data files. Local files go through the panel store;
+    anything else (for example a URL) is handed to :func:`pandas.read_csv`.
+    """
+    if _is_remote(src) or not Path(src).is_file():
+        return pd.read_csv(src, parse_dates=["Date"]).set_index("Date")
+    return open_panel(src).frame()
+
+
+def load_column(src: str | Path, column: str) -> pd.Series:
+    """Load the valid prices of a single instrument.
+
+    Equivalent to ``read_price_csv(src)[column].astype(float).dropna()``,
+    but for local files the values are a zero-copy view into the
+    memory-mapped panel store.
+    """
+    if _is_remote(src) or not Path(src).is_file():
+        df = pd.read_csv(src, parse_dates=["Date"]).set_index("Date")
+        return df[column].astype(float).dropna()
+    return open_panel(src).series(column)
+
+
+if __name__ == "__main__":
+    import time
+
+    path = Path("data/epat_eod.csv")
+    t0 = time.perf_counter()
+    ref = pd.read_csv(path, parse_dates=["Date"]).set_index("Date")
+    t_csv = time.perf_counter() - t0
+
+    ensure_cache(path)  #  first call may build the cache
+    t0 = time.perf_counter()
+    cached = read_price_csv(path)
+    t_cache = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    eurusd = load_column(path, "EURUSD")
+    t_col = time.perf_counter() - t0
+
+    pd.testing.assert_frame_equal(ref, cached)
+    pd.testing.assert_series_equal(ref["EURUSD"].dropna(), eurusd)
+    print("Memory-mapped price store for data/epat_eod.csv")
+    print(f"  cache dir      = {_cache_path(path)}")
+    print(f"  read_csv       = {t_csv * 1e3:.2f} ms")
+    print(f"  cached frame   = {t_cache * 1e3:.2f} ms")
+    print(f"  single column  = {t_col * 1e3:.2f} ms "
+          f"(zero-copy: {not eurusd.to_numpy().flags.owndata})")
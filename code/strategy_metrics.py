@@ -1,6 +1,16 @@
+import hashlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterator, Sequence
+
 import numpy as np
 import pandas as pd
 
+from bootstrap import BOOTSTRAP_METRICS, bootstrap_metrics
+from drawdowns import max_drawdown_and_duration
+from price_store import read_price_csv
+from streaming_metrics import StreamingPanelMetrics
+
 """
 Computation of return and risk metrics for one or more P&L or return series.
 
@@ -19,6 +29,18 @@ The metrics mirror the concepts discussed in the appendix "When is a Strategy
 - maximum drawdown and drawdown duration
 - hit rate and skewness of the return distribution
 
+All series are evaluated together on one 2-D array (see
+``StrategyMetrics._panel_metrics``), so wide panels with thousands of
+strategy columns need no per-column Python loop.
+
+Rolling and expanding-window versions of the main metrics (for example a
+rolling 252-day Sharpe ratio) are computed from cumulative sums for all
+dates and series at once, in time linear in the number of periods.
+
+Stationary or block-bootstrap confidence intervals for Sharpe ratio,
+Sortino ratio, maximum drawdown, and hit rate are provided by
+``StrategyMetrics.bootstrap_from_returns`` (see bootstrap.py).
+
 In the main block, three instruments from data/epat_eod.csv are loaded and
 compared side by side using these metrics.
 
@@ -29,6 +51,46 @@ https://hilpisch.com | https://linktr.ee/dyjh
 """
 
 
+def _compound(mu: np.ndarray, periods: int) -> np.ndarray:
+    """Annualize mean periodic returns as (1 + mu) ** periods - 1.
+
+    Evaluated with Python floats (one value per series), because the
+    vectorized np.power may round differently from float.__pow__ used
+    by the per-series computation.
+    """
+    return np.array([(1.0 + m) ** periods - 1.0 for m in mu.tolist()])
+
+
+def _window_sums(csum: np.ndarray, window: int | None) -> np.ndarray:
+    """Sums over the last ``window`` rows from cumulative sums (all if None)."""
+    if window is None or window >= csum.shape[0]:
+        return csum
+    out = csum.copy()
+    out[window:] -= csum[:-window]
+    return out
+
+
+def _rolling_max(a: np.ndarray, window: int | None) -> np.ndarray:
+    """Maximum of ``a`` over the last ``window`` rows (all rows if None).
+
+    Uses the van Herk/Gil-Werman scheme: within blocks of ``window`` rows,
+    prefix and suffix maxima are running maxima, and every window spans
+    the suffix of one block and the prefix of the next. This needs three
+    comparisons per entry whatever the window length.
+    """
+    n = a.shape[0]
+    if window is None or window >= n:
+        return np.maximum.accumulate(a, axis=0)
+    pad = np.full((-n % window,) + a.shape[1:], -np.inf)
+    blocks = np.concatenate([a, pad]).reshape((-1, window) + a.shape[1:])
+    prefix = np.maximum.accumulate(blocks, axis=1).reshape((-1,) + a.shape[1:])[:n]
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1]
+    suffix = suffix.reshape((-1,) + a.shape[1:])[:n]
+    out = prefix.copy()
+    out[window - 1:] = np.maximum(suffix[:n - window + 1], prefix[window - 1:])
+    return out
+
+
 class StrategyMetrics:
     """Compute risk/return diagnostics for P&L or return series.
 
@@ -62,6 +124,28 @@ class StrategyMetrics:
         self.risk_free_rate = risk_free_rate
         self.sortino_target = sortino_target
         self.benchmark = benchmark
+        #  memoized summaries, keyed by content hash (least recent first)
+        self._cache: OrderedDict[str, pd.DataFrame] = OrderedDict()
+
+    chunk_size = 1024  #  columns per block in the panel computation
+    cache_size = 32  #  memoized summaries per instance (0 disables the cache)
+
+    #  Order of the summary rows: annualized and excess quantities are
+    #  grouped together, followed by risk and distributional stats.
+    metric_order = (
+        "total_return",
+        "ann_return",
+        "ex_ann_return",
+        "ann_vol",
+        "ex_ann_vol",
+        "sharpe",
+        "ex_sharpe",
+        "sortino",
+        "max_drawdown",
+        "dd_duration",
+        "hit_rate",
+        "skewness",
+    )
 
     @staticmethod
     def _to_returns_from_pnl(pnl: pd.Series) -> pd.Series:
@@ -79,7 +163,8 @@ class StrategyMetrics:
         else:
             data_df = data.copy()
         if from_pnl:
-            data_df = data_df.apply(self._to_returns_from_pnl)
+            #  same as applying _to_returns_from_pnl to every column
+            data_df = data_df.sort_index().pct_change(fill_method=None)
         data_df = data_df.dropna(how="all")  #  drop rows that are all NaN
         return data_df
 
@@ -88,28 +173,15 @@ class StrategyMetrics:
         if self.benchmark is None:
             return rets, None
         bench = self.benchmark.sort_index().dropna()
-        #  align on common dates
-        joint = rets.join(bench.to_frame("benchmark"), how="inner")
-        rets_aligned = joint[rets.columns]
-        bench_aligned = joint["benchmark"]
-        return rets_aligned, bench_aligned
+        #  keep common dates via integer positions (an inner join on dates)
+        pos = bench.index.get_indexer(rets.index)
+        keep = pos >= 0
+        return rets.iloc[keep], bench.iloc[pos[keep]]
 
     @staticmethod
     def _max_drawdown_and_duration(equity: np.ndarray) -> tuple[float, int]:
         """Compute maximum drawdown and its duration for one equity curve."""
-        peak = np.maximum.accumulate(equity)
-        dd = equity / peak - 1.0  #  drawdown series
-        underwater = dd < 0.0
-        max_dur = 0
-        cur = 0
-        for flag in underwater:
-            if flag:
-                cur += 1
-                if cur > max_dur:
-                    max_dur = cur
-            else:
-                cur = 0
-        return float(dd.min()), int(max_dur)
+        return max_drawdown_and_duration(equity)
 
     def _metric_dict_for_series(
         self,
@@ -171,10 +243,9 @@ class StrategyMetrics:
 
         #  excess return metrics relative to benchmark, if provided
         if bench_rets is not None:
-            aligned = rets_clean.to_frame("s").join(
-                bench_rets.to_frame("b"), how="inner"
-            )
-            ex = aligned["s"] - aligned["b"]
+            pos = bench_rets.index.get_indexer(rets_clean.index)
+            keep = pos >= 0
+            ex = rets_clean.iloc[keep] - bench_rets.iloc[pos[keep]].to_numpy()
             ex_mu = float(ex.mean())
             ex_sigma = float(ex.std(ddof=1))
             ex_ann_ret = (1.0 + ex_mu) ** self.periods_per_year - 1.0
@@ -204,6 +275,404 @@ class StrategyMetrics:
             "ex_sharpe": float(ex_sharpe),
         }
 
+    def _panel_metrics(
+        self,
+        rets: np.ndarray,
+        bench_rets: np.ndarray | None,
+    ) -> dict[str, np.ndarray]:
+        """Compute all metrics for a (time x series) array of returns.
+
+        Panel version of :meth:`_metric_dict_for_series`: NaN entries are
+        masked instead of dropped, and every metric is a reduction along
+        time. The arrays are processed as contiguous (series x time)
+        blocks of ``chunk_size`` series, so reductions use NumPy's
+        pairwise summation per series just like pandas. Results agree
+        with the per-series path to the last bit, except where masking
+        changes the grouping of a sum (NaN gaps, the Sortino downside
+        subset) and for the skewness (cubes by multiplication), which
+        differ only in the last bits.
+        """
+        n_series = rets.shape[1]
+        out = {name: np.empty(n_series) for name in (
+            "total_return", "ann_return", "ann_vol", "sharpe", "sortino",
+            "max_drawdown", "dd_duration", "hit_rate", "skewness",
+            "ex_ann_return", "ex_ann_vol", "ex_sharpe")}
+        ppy = self.periods_per_year
+        root_ppy = np.sqrt(ppy)
+        target = self.sortino_target
+        for c0 in range(0, n_series, self.chunk_size):
+            c1 = min(c0 + self.chunk_size, n_series)
+            x = np.ascontiguousarray(rets[:, c0:c1].T)  #  series x time
+            valid = ~np.isnan(x)
+            n = valid.sum(axis=1)
+            if (n == 0).any():
+                raise ValueError(f"no valid returns for series {c0 + int(np.argmin(n))}")
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mu = np.where(valid, x, 0.0).sum(axis=1) / n
+                centered = np.where(valid, x - mu[:, None], 0.0)
+                sigma = np.sqrt((centered ** 2).sum(axis=1) / (n - 1))
+                sigma[n < 2] = np.nan
+
+                out["ann_return"][c0:c1] = _compound(mu, ppy)
+                out["ann_vol"][c0:c1] = sigma * root_ppy
+                out["sharpe"][c0:c1] = np.where(
+                    sigma > 0.0, (mu - self.risk_free_rate) / sigma * root_ppy, np.nan)
+
+                #  downside deviation over the returns below the target
+                down = valid & (x < target)
+                n_down = down.sum(axis=1)
+                sigma_down = np.sqrt(
+                    np.where(down, (x - target) ** 2, 0.0).sum(axis=1) / n_down)
+                out["sortino"][c0:c1] = np.where(
+                    (n_down > 0) & (sigma_down > 0.0),
+                    (mu - target) / sigma_down * root_ppy, np.nan)
+
+                out["hit_rate"][c0:c1] = (valid & (x > 0.0)).sum(axis=1) / n
+                z = centered / sigma[:, None]
+                cubed = z * z * z  #  ~10x faster than ** 3; masked entries stay 0
+                out["skewness"][c0:c1] = np.where(
+                    sigma > 0.0, cubed.sum(axis=1) / n, np.nan)
+
+                #  equity over valid dates only; masked dates keep the level
+                equity = np.cumprod(np.where(valid, 1.0 + x, 1.0), axis=1)
+                out["total_return"][c0:c1] = equity[:, -1] - 1.0
+                equity[~valid] = np.nan  #  masked dates do not end a drawdown
+                out["max_drawdown"][c0:c1], out["dd_duration"][c0:c1] = (
+                    max_drawdown_and_duration(equity, axis=1))
+
+                if bench_rets is not None:
+                    ex = np.where(valid, x - bench_rets, 0.0)
+                    ex_mu = ex.sum(axis=1) / n
+                    ex_centered = np.where(valid, x - bench_rets - ex_mu[:, None], 0.0)
+                    ex_sigma = np.sqrt((ex_centered ** 2).sum(axis=1) / (n - 1))
+                    ex_sigma[n < 2] = np.nan
+                    out["ex_ann_return"][c0:c1] = _compound(ex_mu, ppy)
+                    out["ex_ann_vol"][c0:c1] = ex_sigma * root_ppy
+                    out["ex_sharpe"][c0:c1] = np.where(
+                        ex_sigma > 0.0, ex_mu / ex_sigma * root_ppy, np.nan)
+                else:
+                    for name in ("ex_ann_return", "ex_ann_vol", "ex_sharpe"):
+                        out[name][c0:c1] = np.nan
+        return out
+
+    def _summarize_panel(
+        self, rets: pd.DataFrame, bench: pd.Series | None
+    ) -> pd.DataFrame:
+        """Metrics DataFrame (metrics x series) for aligned returns."""
+        try:
+            metrics = self._panel_metrics(
+                rets.to_numpy(dtype=float),
+                None if bench is None else bench.to_numpy(dtype=float),
+            )
+        except ValueError:
+            n_valid = rets.notna().sum()
+            name = n_valid.index[int(np.argmin(n_valid.to_numpy()))]
+            raise ValueError(f"no valid returns for series '{name}'") from None
+        result = pd.DataFrame(metrics, index=rets.columns).T
+
+        return result.reindex(index=list(self.metric_order))
+
+    #  metrics of rolling_from_returns and expanding_from_returns
+    window_metrics = (
+        "total_return",
+        "ann_return",
+        "ann_vol",
+        "sharpe",
+        "sortino",
+        "hit_rate",
+        "drawdown",
+    )
+
+    def _window_metrics(
+        self,
+        rets: np.ndarray,
+        windows: tuple[int | None, ...],
+        min_periods: tuple[int, ...],
+    ) -> list[dict[str, np.ndarray]]:
+        """Metrics over trailing windows for a (time x series) array.
+
+        Every metric is a function of window sums, which are differences
+        of cumulative sums shared by all window lengths, so the cost does
+        not depend on the window length. ``None`` stands for expanding
+        windows. Returns are centered by their column mean before
+        squaring to limit the cancellation in the variance. ``drawdown``
+        is measured from the highest equity level within the window,
+        including the level just before its first return. A return of -1
+        or below wipes out the equity: windows that contain one have
+        ``total_return`` and ``drawdown`` of -1, later windows are not
+        affected.
+        """
+        ppy = self.periods_per_year
+        root_ppy = np.sqrt(ppy)
+        target = self.sortino_target
+        valid = ~np.isnan(rets)
+        x = np.where(valid, rets, 0.0)
+        down = valid & (x < target)
+        ruin = x <= -1.0  #  log1p would give -inf or NaN for all later sums
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shift = x.sum(axis=0) / valid.sum(axis=0)  #  column means
+        shift[~np.isfinite(shift)] = 0.0
+        xc = np.where(valid, x - shift, 0.0)
+        csums = {
+            "n": np.cumsum(valid, axis=0, dtype=float),
+            "n_down": np.cumsum(down, axis=0, dtype=float),
+            "n_pos": np.cumsum(x > 0.0, axis=0, dtype=float),
+            "s1": np.cumsum(xc, axis=0),
+            "s2": np.cumsum(xc * xc, axis=0),
+            "d2": np.cumsum(np.where(down, (x - target) ** 2, 0.0), axis=0),
+            "log_equity": np.cumsum(np.log1p(np.where(ruin, 0.0, x)), axis=0),
+            "n_ruin": np.cumsum(ruin, axis=0, dtype=float),
+        }
+
+        results = []
+        for window, min_n in zip(windows, min_periods):
+            n, n_down, n_pos, s1, s2, d2, log_growth, n_ruin = (
+                _window_sums(cs, window) for cs in csums.values())
+            out = {}
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mu = s1 / n + shift
+                sigma = np.sqrt(np.maximum(s2 - s1 * s1 / n, 0.0) / (n - 1.0))
+                sigma_down = np.sqrt(d2 / n_down)
+                out["total_return"] = np.where(n_ruin > 0, -1.0, np.expm1(log_growth))
+                out["ann_return"] = (1.0 + mu) ** ppy - 1.0
+                out["ann_vol"] = sigma * root_ppy
+                out["sharpe"] = np.where(
+                    sigma > 0.0, (mu - self.risk_free_rate) / sigma * root_ppy, np.nan)
+                out["sortino"] = np.where(
+                    (n_down > 0) & (sigma_down > 0.0),
+                    (mu - target) / sigma_down * root_ppy, np.nan)
+                out["hit_rate"] = n_pos / n
+            log_equity = csums["log_equity"]
+            #  window + 1 rows: the high includes the level before the window
+            high = _rolling_max(log_equity, None if window is None else window + 1)
+            out["drawdown"] = np.where(n_ruin > 0, -1.0, np.expm1(log_equity - high))
+            if window is None:
+                out["max_drawdown"] = np.minimum.accumulate(out["drawdown"], axis=0)
+            short = n < min_n
+            for values in out.values():
+                values[short] = np.nan
+            results.append(out)
+        return results
+
+    def _window_frame(
+        self,
+        rets: pd.DataFrame,
+        windows: tuple[int | None, ...],
+        min_periods: tuple[int, ...],
+    ) -> list[pd.DataFrame]:
+        """Window metrics as DataFrames with (metric, series) columns."""
+        values = rets.to_numpy(dtype=float)
+        blocks = [
+            self._window_metrics(values[:, c0:c0 + self.chunk_size], windows, min_periods)
+            for c0 in range(0, values.shape[1], self.chunk_size)
+        ]
+        frames = []
+        for k, window in enumerate(windows):
+            names = list(self.window_metrics)
+            if window is None:
+                names.append("max_drawdown")
+            data = np.hstack([blk[k][name] for name in names for blk in blocks])
+            columns = pd.MultiIndex.from_product(
+                [names, rets.columns], names=["metric", "series"])
+            frames.append(pd.DataFrame(data, index=rets.index, columns=columns))
+        return frames
+
+    def rolling_from_returns(
+        self,
+        rets: pd.Series | pd.DataFrame,
+        windows: int | tuple[int, ...] = (63, 126, 252),
+        min_periods: int | None = None,
+    ) -> pd.DataFrame:
+        """Rolling metrics of one or more return series r_t.
+
+        Computes the metrics of ``window_metrics`` over the trailing
+        ``window`` periods for every date, in time linear in the number
+        of periods for any window length. Windows with fewer than
+        ``min_periods`` valid returns (default: the window length, as in
+        pandas) give NaN.
+
+        Returns a DataFrame indexed by date whose columns are a
+        MultiIndex of (window, metric, series).
+        """
+        rets_df = self._ensure_returns(rets, from_pnl=False)
+        windows = (windows,) if isinstance(windows, int) else tuple(windows)
+        frames = self._window_frame(
+            rets_df, windows,
+            tuple(w if min_periods is None else min_periods for w in windows))
+        return pd.concat(dict(zip(windows, frames)), axis=1, names=["window"])
+
+    def rolling_from_pnl(
+        self,
+        pnl: pd.Series | pd.DataFrame,
+        windows: int | tuple[int, ...] = (63, 126, 252),
+        min_periods: int | None = None,
+    ) -> pd.DataFrame:
+        """Rolling metrics when input is one or more P&L series x_t."""
+        rets = self._ensure_returns(pnl, from_pnl=True)
+        return self.rolling_from_returns(rets, windows, min_periods)
+
+    def expanding_from_returns(
+        self,
+        rets: pd.Series | pd.DataFrame,
+        min_periods: int = 2,
+    ) -> pd.DataFrame:
+        """Expanding-window metrics of one or more return series r_t.
+
+        Same metrics as :meth:`rolling_from_returns` from the first date
+        up to every date, plus ``max_drawdown`` to date. Columns are a
+        MultiIndex of (metric, series).
+        """
+        rets_df = self._ensure_returns(rets, from_pnl=False)
+        return self._window_frame(rets_df, (None,), (min_periods,))[0]
+
+    def expanding_from_pnl(
+        self,
+        pnl: pd.Series | pd.DataFrame,
+        min_periods: int = 2,
+    ) -> pd.DataFrame:
+        """Expanding-window metrics when input is one or more P&L series x_t."""
+        rets = self._ensure_returns(pnl, from_pnl=True)
+        return self.expanding_from_returns(rets, min_periods)
+
+    def bootstrap_from_returns(
+        self,
+        rets: pd.Series | pd.DataFrame,
+        n_resamples: int = 1000,
+        confidence: float = 0.95,
+        method: str = "stationary",
+        block_length: float = 20.0,
+        seed: int | None = None,
+        max_workers: int = 1,
+    ) -> pd.DataFrame:
+        """Bootstrap confidence intervals for one or more return series r_t.
+
+        Resamples dates with the stationary (or circular block) bootstrap
+        of :mod:`bootstrap` and returns, for Sharpe ratio, Sortino ratio,
+        maximum drawdown, and hit rate, the estimate on the original
+        series and the percentile interval at level ``confidence``.
+        ``max_workers`` > 1 scores the resamples in a process pool.
+
+        The index of the resulting DataFrame is a MultiIndex of
+        (metric, statistic) with statistics estimate, lower, and upper;
+        columns correspond to the individual series in the input.
+        """
+        rets_df = self._ensure_returns(rets, from_pnl=False)
+        values = rets_df.to_numpy(dtype=float)
+        params = (self.periods_per_year, self.risk_free_rate, self.sortino_target)
+        estimate = self._panel_metrics(values, None)
+        dist = bootstrap_metrics(
+            values, n_resamples, method, block_length, seed, *params,
+            max_workers=max_workers)
+        alpha = (1.0 - confidence) / 2.0
+        rows = {}
+        for name in BOOTSTRAP_METRICS:
+            lower, upper = np.nanquantile(dist[name], [alpha, 1.0 - alpha], axis=0)
+            rows[(name, "estimate")] = estimate[name]
+            rows[(name, "lower")] = lower
+            rows[(name, "upper")] = upper
+        result = pd.DataFrame.from_dict(rows, orient="index", columns=rets_df.columns)
+        result.index = pd.MultiIndex.from_tuples(result.index, names=["metric", "statistic"])
+        return result
+
+    def bootstrap_from_pnl(
+        self,
+        pnl: pd.Series | pd.DataFrame,
+        **kwargs,
+    ) -> pd.DataFrame:
+        """Bootstrap confidence intervals when input is P&L series x_t.
+
+        Keyword arguments are those of :meth:`bootstrap_from_returns`.
+        """
+        rets = self._ensure_returns(pnl, from_pnl=True)
+        return self.bootstrap_from_returns(rets, **kwargs)
+
+    def summarize_chunked(
+        self,
+        source: str | Path | np.ndarray,
+        columns: Sequence | None = None,
+        benchmark: str | np.ndarray | None = None,
+        chunk_rows: int | None = None,
+    ) -> pd.DataFrame:
+        """Compute metrics of a return panel too large for memory.
+
+        Streams blocks of ``chunk_rows`` rows from ``source`` through a
+        :class:`streaming_metrics.StreamingPanelMetrics` accumulator, which
+        keeps mergeable per-column statistics (moment sums, downside sums,
+        compounded equity, running peak, and drawdown state). The result
+        equals ``summarize_from_returns`` on the full panel up to rounding.
+
+        Parameters
+        ----------
+        source : str, Path, or np.ndarray
+            A (time x series) array (e.g. a memmap), a ``.npy`` file, which
+            is memory-mapped, or a ``.parquet`` file (requires pyarrow),
+            holding periodic returns with NaN for missing values.
+        columns : sequence, optional
+            Series names for arrays and ``.npy`` files, or the columns to
+            read from a Parquet file (default: all but the index).
+        benchmark : str or np.ndarray, optional
+            Row-aligned benchmark returns, or the name of a Parquet
+            column holding them. Rows without a benchmark return are
+            dropped. ``self.benchmark`` is not used, as the panel has no
+            date index to align it with.
+        chunk_rows : int, optional
+            Number of rows per block; by default blocks hold about two
+            million values (small blocks keep the temporaries in cache).
+        """
+        names, blocks = _row_blocks(source, columns, benchmark, chunk_rows)
+        acc = StreamingPanelMetrics(
+            len(names), self.periods_per_year, self.risk_free_rate,
+            self.sortino_target)
+        for block, bench in blocks:
+            acc.update(block, bench)
+        if (acc.n == 0).any():
+            name = names[int(np.argmin(acc.n))]
+            raise ValueError(f"no valid returns for series '{name}'")
+        result = pd.DataFrame(acc.snapshot(), index=pd.Index(names)).T
+        return result.reindex(index=list(self.metric_order))
+
+    def _cache_key(self, data: pd.Series | pd.DataFrame, from_pnl: bool) -> str:
+        """Content hash of input, benchmark, and parameters."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((from_pnl, self.periods_per_year, self.risk_free_rate,
+                            self.sortino_target)).encode())
+        frames = [data] if self.benchmark is None else [data, self.benchmark]
+        for frame in frames:
+            if isinstance(frame, pd.Series):
+                frame = frame.to_frame(name=frame.name or "series")
+            index = np.asarray(frame.index)
+            digest.update(repr(list(frame.columns)).encode())
+            digest.update(repr(list(index)).encode() if index.dtype == object
+                          else np.ascontiguousarray(index).view(np.uint8))
+            digest.update(np.ascontiguousarray(frame.to_numpy(dtype=float)).view(np.uint8))
+        return digest.hexdigest()
+
+    def _summarize(
+        self, data: pd.Series | pd.DataFrame, from_pnl: bool
+    ) -> pd.DataFrame:
+        """Shared pipeline: returns, benchmark alignment, metrics, memoization.
+
+        Results are cached per instance under a content hash of the input
+        values, index, and columns, the benchmark, and the parameters, and
+        the least recently used entry is dropped beyond ``cache_size``
+        entries. Callers receive copies, so the cache cannot be modified
+        from outside.
+        """
+        key = self._cache_key(data, from_pnl) if self.cache_size else None
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key].copy()
+        rets = self._ensure_returns(data, from_pnl=from_pnl)
+        rets_aligned, bench = self._align_with_benchmark(rets)
+        result = self._summarize_panel(rets_aligned, bench)
+        if key is not None:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            result = result.copy()
+        return result
+
     def summarize_from_pnl(
         self, pnl: pd.Series | pd.DataFrame
     ) -> pd.DataFrame:
@@ -212,73 +681,89 @@ class StrategyMetrics:
         The index of the resulting DataFrame contains metric names;
         columns correspond to the individual series in the input.
         """
-        rets = self._ensure_returns(pnl, from_pnl=True)
-        rets_aligned, bench = self._align_with_benchmark(rets)
-
-        metrics: dict[str, dict[str, float]] = {}
-        for col in rets_aligned.columns:
-            ser = rets_aligned[col]
-            metrics[col] = self._metric_dict_for_series(col, ser, bench)
-
-        result = pd.DataFrame(metrics)
-
-        #  Order metrics so that annualized and excess quantities are
-        #  grouped together, followed by risk and distributional stats.
-        metric_order = [
-            "total_return",
-            "ann_return",
-            "ex_ann_return",
-            "ann_vol",
-            "ex_ann_vol",
-            "sharpe",
-            "ex_sharpe",
-            "sortino",
-            "max_drawdown",
-            "dd_duration",
-            "hit_rate",
-            "skewness",
-        ]
-        present = [m for m in metric_order if m in result.index]
-        result = result.reindex(index=present)
-        return result
+        return self._summarize(pnl, from_pnl=True)
 
     def summarize_from_returns(
         self, rets: pd.Series | pd.DataFrame
     ) -> pd.DataFrame:
         """Compute metrics when input is one or more return series r_t."""
-        rets_df = self._ensure_returns(rets, from_pnl=False)
-        rets_aligned, bench = self._align_with_benchmark(rets_df)
-
-        metrics: dict[str, dict[str, float]] = {}
-        for col in rets_aligned.columns:
-            ser = rets_aligned[col]
-            metrics[col] = self._metric_dict_for_series(col, ser, bench)
-
-        result = pd.DataFrame(metrics)
-
-        metric_order = [
-            "total_return",
-            "ann_return",
-            "ex_ann_return",
-            "ann_vol",
-            "ex_ann_vol",
-            "sharpe",
-            "ex_sharpe",
-            "sortino",
-            "max_drawdown",
-            "dd_duration",
-            "hit_rate",
-            "skewness",
-        ]
-        present = [m for m in metric_order if m in result.index]
-        result = result.reindex(index=present)
-        return result
+        return self._summarize(rets, from_pnl=False)
+
+
+def _default_chunk_rows(n_series: int) -> int:
+    """Rows per block for about two million values per block."""
+    return max(64, (1 << 21) // max(n_series, 1))
+
+
+def _row_blocks(
+    source: str | Path | np.ndarray,
+    columns: Sequence | None,
+    benchmark: str | np.ndarray | None,
+    chunk_rows: int | None,
+) -> tuple[list, Iterator[tuple[np.ndarray, np.ndarray | None]]]:
+    """Series names and an iterator over (returns, benchmark) row blocks."""
+    if isinstance(source, (str, Path)) and str(source).endswith(".parquet"):
+        return _parquet_blocks(Path(source), columns, benchmark, chunk_rows)
+    if isinstance(source, (str, Path)):
+        source = np.load(source, mmap_mode="r")  #  pages in block by block
+    if source.ndim != 2:
+        raise ValueError("return panel must be two-dimensional (time x series)")
+    names = list(range(source.shape[1])) if columns is None else list(columns)
+    if len(names) != source.shape[1]:
+        raise ValueError("number of column names does not match the panel")
+    if isinstance(benchmark, str):
+        raise ValueError("benchmark columns are only supported for Parquet files")
+    chunk_rows = chunk_rows or _default_chunk_rows(len(names))
+
+    def blocks() -> Iterator[tuple[np.ndarray, np.ndarray | None]]:
+        for r0 in range(0, source.shape[0], chunk_rows):
+            bench = None if benchmark is None else benchmark[r0:r0 + chunk_rows]
+            yield np.asarray(source[r0:r0 + chunk_rows], dtype=float), bench
+
+    return names, blocks()
+
+
+def _parquet_blocks(
+    path: Path,
+    columns: Sequence | None,
+    benchmark: str | np.ndarray | None,
+    chunk_rows: int | None,
+) -> tuple[list, Iterator[tuple[np.ndarray, np.ndarray | None]]]:
+    """Row blocks of a Parquet file, read batch by batch with pyarrow."""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("reading Parquet files requires pyarrow") from None
+    pf = pq.ParquetFile(path)
+    if columns is None:
+        meta = pf.schema_arrow.pandas_metadata or {}
+        index_cols = {c for c in meta.get("index_columns", []) if isinstance(c, str)}
+        columns = [c for c in pf.schema_arrow.names
+                   if c not in index_cols and c != benchmark]
+    names = list(columns)
+    read = names + [benchmark] if isinstance(benchmark, str) else names
+    chunk_rows = chunk_rows or _default_chunk_rows(len(names))
+
+    def blocks() -> Iterator[tuple[np.ndarray, np.ndarray | None]]:
+        r0 = 0
+        for batch in pf.iter_batches(batch_size=chunk_rows, columns=read):
+            arrays = [batch.column(k).to_numpy(zero_copy_only=False).astype(float)
+                      for k in range(batch.num_columns)]
+            if isinstance(benchmark, str):
+                bench = arrays.pop()
+            elif benchmark is not None:
+                bench = benchmark[r0:r0 + batch.num_rows]
+            else:
+                bench = None
+            r0 += batch.num_rows
+            yield np.column_stack(arrays), bench
+
+    return names, blocks()
 
 
 def _load_prices(csv_path: str = "data/epat_eod.csv") -> pd.DataFrame:
     """Load daily prices for multiple instruments from the EPAT CSV file."""
-    df = pd.read_csv(csv_path, parse_dates=["Date"])
-    df = df.set_index("Date")
+    df = read_price_csv(csv_path)  #  binary columnar cache
     prices = df.astype(float).dropna(how="all")  #  drop rows with all NaN
     return prices
 
@@ -338,3 +823,24 @@ if __name__ == "__main__":
                 formatted.loc[metric, col] = f"{val:.{dec}f}"
 
     print(formatted.to_string())
+
+    #  Rolling one-year metrics, computed for all dates in one pass.
+    rolling = metrics_engine.rolling_from_pnl(prices, windows=(63, 252))
+    latest = rolling.xs(252, axis=1, level="window").iloc[-1].unstack("series")[cols]
+    print(f"\nRolling 252-day metrics on {rolling.index[-1]:%Y-%m-%d}\n")
+    print(latest.loc[["ann_vol", "sharpe", "sortino", "hit_rate", "drawdown"]]
+          .round(3).to_string())
+
+    #  the window high includes the equity level before the window, as
+    #  for drawdown_curve on the window's own equity curve
+    from drawdowns import drawdown_curve
+    window_rets = metrics_engine._ensure_returns(prices, from_pnl=True).iloc[-63:]
+    window_equity = np.vstack([np.ones((1, len(cols))),
+                               np.cumprod(1.0 + window_rets.fillna(0.0).to_numpy(), axis=0)])
+    assert np.allclose(drawdown_curve(window_equity)[-1],
+                       rolling[63]["drawdown"].iloc[-1][cols].to_numpy())
+
+    #  Stationary-bootstrap 95% intervals (mean block length of 20 days).
+    intervals = metrics_engine.bootstrap_from_pnl(prices, n_resamples=1000, seed=100)
+    print("\nStationary-bootstrap 95% confidence intervals\n")
+    print(intervals.round(3).to_string())
@@ -10,8 +10,12 @@ https://hilpisch.com | https://linktr.ee/dyjh
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import sliding_window_view
 from pathlib import Path
 
+from drawdowns import max_drawdown_and_duration
+from price_store import load_column
+
 DATA_URL = ("https://raw.githubusercontent.com/yhilpisch/epatcode/"
             "refs/heads/main/data/epat_eod.csv")
 
@@ -22,8 +26,9 @@ def load_prices(path: str="data/epat_eod.csv",
                 column: str="EURUSD") -> pd.Series:
     """Load end-of-day prices for a single instrument.
 
-    Uses a local CSV file if available; otherwise falls back to the
-    remote URL, letting :func:`pandas.read_csv` stream the data.
+    Uses a local CSV file if available (through the memory-mapped store
+    in :mod:`price_store`); otherwise falls back to the remote URL, letting
+    :func:`pandas.read_csv` stream the data.
     """
     local_path = Path(path)
     if local_path.is_file():
@@ -31,15 +36,17 @@ def load_prices(path: str="data/epat_eod.csv",
     else:
         src = DATA_URL
         print(f"Local data file {local_path} not found, loading from {DATA_URL}")
-    df = pd.read_csv(src, parse_dates=["Date"])
-    df = df.set_index("Date")
-    prices = df[column].astype(float).dropna()
+    prices = load_column(src, column)  #  zero-copy view for local files
     return prices
 
 
 def make_lagged_returns(prices: pd.Series,
                         lags: int=7) -> tuple[np.ndarray, np.ndarray, pd.DatetimeIndex]:
-    """Compute log-returns and build a lagged design matrix."""
+    """Compute log-returns and build a lagged design matrix.
+
+    The design matrix is a read-only strided view on the return vector
+    (row t holds r_{t-1},...,r_{t-lags}), so no lag columns are copied.
+    """
     log_prices = np.log(prices.to_numpy())
     rets = np.diff(log_prices)  #  r_t = log S_t - log S_{t-1}
     dates = prices.index[1:]
@@ -48,36 +55,137 @@ def make_lagged_returns(prices: pd.Series,
     if n <= lags:
         raise ValueError("Not enough observations for the chosen number of lags.")
 
-    X = np.column_stack(
-        [rets[(lags - k):(n - k)] for k in range(1, lags + 1)]
-    )  #  columns r_{t-1},...,r_{t-lags}
+    X = lag_matrix(rets, lags)  #  columns r_{t-1},...,r_{t-lags}
     y = rets[lags:]  #  target r_t
     dates_eff = dates[lags:]  #  effective dates for y and X rows
     return X, y, dates_eff
 
 
+def lag_matrix(rets: np.ndarray, lags: int) -> np.ndarray:
+    """Return the lagged-returns matrix as a read-only view on ``rets``.
+
+    Row i holds r_{t-1},...,r_{t-lags} for the target r_t = rets[lags + i].
+    """
+    return sliding_window_view(rets[:-1], lags)[:, ::-1]
+
+
+def add_intercept(X: np.ndarray) -> np.ndarray:
+    """Return the design matrix [1, X] in a single allocation."""
+    X_design = np.empty((X.shape[0], X.shape[1] + 1))
+    X_design[:, 0] = 1.0  #  intercept column
+    X_design[:, 1:] = X
+    return X_design
+
+
 def fit_ols(X: np.ndarray, y: np.ndarray) -> np.ndarray:
     """Estimate linear model y = beta_0 + X beta via OLS."""
-    X_design = np.column_stack([np.ones(X.shape[0]), X])  #  add intercept column
+    X_design = add_intercept(X)  #  add intercept column
     beta = np.linalg.lstsq(X_design, y, rcond=None)[0]
     return beta
 
 
-def run_lag_strategy(X: np.ndarray, y: np.ndarray,
-                     beta: np.ndarray,
-                     cost: float=0.0001) -> np.ndarray:
-    """Compute strategy returns from lagged OLS predictions."""
-    X_design = np.column_stack([np.ones(X.shape[0]), X])
-    y_pred = X_design @ beta  #  one-step-ahead forecasts
-
-    pos = np.sign(y_pred)  #  -1, 0, or +1 depending on forecast sign
+def walk_forward_ols(X: np.ndarray, y: np.ndarray,
+                     window: int | None=None,
+                     min_periods: int | None=None,
+                     chunk_size: int=4096) -> np.ndarray:
+    """Estimate out-of-sample OLS coefficients for every date.
+
+    Row t of the result holds the coefficients of y = beta_0 + X beta
+    fitted on rows s < t only: all of them for an expanding window
+    (``window=None``) or the last ``window`` rows for a rolling one.
+    Rows with fewer than ``min_periods`` observations are NaN.
+
+    Instead of refitting at every date, the Gram matrices Z'Z and Z'y
+    are updated with one rank-one term per new row (and downdated by
+    the row leaving a rolling window) via cumulative sums. All
+    (k+1) x (k+1) systems of a chunk are then solved in one batched
+    call, so the whole path costs O(n k^3) in compiled code. For an
+    expanding window the exact Gram matrix at the start of a chunk is
+    the previous one plus the sums over the previous chunk's rows; for a
+    rolling window it is recomputed from the rows in the window, which
+    bounds the rounding drift of the downdates.
+    """
+    n, k = X.shape
+    Z = add_intercept(X)  #  intercept-augmented design
+    if min_periods is None:
+        min_periods = window if window is not None else k + 1
+    betas = np.full((n, k + 1), np.nan)
+    gram0 = np.zeros((k + 1, k + 1))  #  exact sums over rows < start
+    xty0 = np.zeros(k + 1)
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        if window is not None:
+            lo = max(start - window, 0)
+            gram0 = Z[lo:start].T @ Z[lo:start]
+            xty0 = Z[lo:start].T @ y[lo:start]
+
+        t = np.arange(start, stop)
+        add = t - 1  #  row entering the estimation sample at date t
+        z_add = np.where((add >= 0)[:, None], Z[np.maximum(add, 0)], 0.0)
+        y_add = np.where(add >= 0, y[np.maximum(add, 0)], 0.0)
+        d_gram = z_add[:, :, None] * z_add[:, None, :]  #  rank-one updates
+        d_xty = z_add * y_add[:, None]
+        if window is not None:
+            drop = t - 1 - window  #  row leaving the rolling window
+            z_drop = np.where((drop >= 0)[:, None], Z[np.maximum(drop, 0)], 0.0)
+            y_drop = np.where(drop >= 0, y[np.maximum(drop, 0)], 0.0)
+            d_gram -= z_drop[:, :, None] * z_drop[:, None, :]  #  downdates
+            d_xty -= z_drop * y_drop[:, None]
+        #  the update for row start - 1 is already part of gram0
+        d_gram[0] = 0.0
+        d_xty[0] = 0.0
+        gram = gram0 + np.cumsum(d_gram, axis=0)
+        xty = xty0 + np.cumsum(d_xty, axis=0)
+        if window is None:  #  carry the exact sums into the next chunk
+            gram0 = gram0 + Z[start:stop].T @ Z[start:stop]
+            xty0 = xty0 + Z[start:stop].T @ y[start:stop]
+
+        n_obs = t if window is None else np.minimum(t, window)
+        ok = n_obs >= max(min_periods, 1)
+        if not ok.any():
+            continue
+        try:
+            sol = np.linalg.solve(gram[ok], xty[ok][:, :, None])[:, :, 0]
+        except np.linalg.LinAlgError:  #  singular window, e.g. constant data
+            sol = np.einsum("tij,tj->ti", np.linalg.pinv(gram[ok]), xty[ok])
+        betas[start:stop][ok] = sol
+    return betas
+
+
+def walk_forward_forecasts(X: np.ndarray, y: np.ndarray,
+                           window: int | None=None,
+                           min_periods: int | None=None) -> np.ndarray:
+    """Out-of-sample one-step-ahead forecasts (NaN without enough history)."""
+    betas = walk_forward_ols(X, y, window=window, min_periods=min_periods)
+    return betas[:, 0] + np.einsum("ti,ti->t", X, betas[:, 1:])
+
+
+def run_forecast_strategy(y_pred: np.ndarray, y: np.ndarray,
+                          cost: float=0.0001, model=None) -> np.ndarray:
+    """Compute strategy returns from return forecasts.
+
+    Dates without a forecast (NaN) are treated as flat positions. If an
+    execution model (see :mod:`execution_models`) is given, its
+    ``turnover_costs`` replace the proportional ``cost * turnover``.
+    """
+    pos = np.nan_to_num(np.sign(y_pred))  #  -1, 0, or +1 depending on forecast sign
     strat_rets = pos * y  #  gross strategy returns; prediction for r_t applied to r_t
 
     turnover = np.abs(pos[1:] - pos[:-1])  #  trades per step
-    strat_rets[1:] = strat_rets[1:] - cost * turnover  #  apply transaction costs
+    costs = cost * turnover if model is None else model.turnover_costs(turnover)
+    strat_rets[1:] = strat_rets[1:] - costs  #  apply transaction costs
     return strat_rets
 
 
+def run_lag_strategy(X: np.ndarray, y: np.ndarray,
+                     beta: np.ndarray,
+                     cost: float=0.0001) -> np.ndarray:
+    """Compute strategy returns from lagged OLS predictions."""
+    y_pred = beta[0] + X @ beta[1:]  #  one-step-ahead forecasts, no design copy
+    return run_forecast_strategy(y_pred, y, cost)
+
+
 def plot_equity(dates: pd.DatetimeIndex,
                 y: np.ndarray,
                 strat_rets: np.ndarray,
@@ -106,23 +214,6 @@ def plot_equity(dates: pd.DatetimeIndex,
     plt.close(fig)
 
 
-def max_drawdown_and_duration(equity: np.ndarray) -> tuple[float, int]:
-    """Compute maximum drawdown and its duration (in periods)."""
-    peak = np.maximum.accumulate(equity)
-    dd = equity / peak - 1.0  #  drawdown series (<= 0)
-    underwater = dd < 0.0
-    max_dur = 0
-    cur = 0
-    for flag in underwater:
-        if flag:
-            cur += 1
-            if cur > max_dur:
-                max_dur = cur
-        else:
-            cur = 0
-    return float(dd.min()), int(max_dur)
-
-
 if __name__ == "__main__":
     prices = load_prices()
     X, y, dates = make_lagged_returns(prices, lags=7)
@@ -143,36 +234,28 @@ if __name__ == "__main__":
     strat_rets = run_lag_strategy(X, y, beta)
     plot_equity(dates, y, strat_rets)
 
-    bh_eq = np.cumprod(1.0 + y)
-    strat_eq = np.cumprod(1.0 + strat_rets)
-
-    total_ret_bh = float(bh_eq[-1] - 1.0)
-    total_ret_strat = float(strat_eq[-1] - 1.0)
-
-    max_dd_bh, dur_bh = max_drawdown_and_duration(bh_eq)
-    max_dd_strat, dur_strat = max_drawdown_and_duration(strat_eq)
-
-    ann_ret_bh = float(y.mean() * 252.0)
-    ann_vol_bh = float(y.std(ddof=1) * np.sqrt(252.0))
-    ann_ret_strat = float(strat_rets.mean() * 252.0)
-    ann_vol_strat = float(strat_rets.std(ddof=1) * np.sqrt(252.0))
-
-    sharpe_bh = ann_ret_bh / ann_vol_bh if ann_vol_bh > 0.0 else float("nan")
-    sharpe_strat = (ann_ret_strat / ann_vol_strat
-                    if ann_vol_strat > 0.0 else float("nan"))
-
-    summary = pd.DataFrame(
-        {
-            "final_equity": [bh_eq[-1], strat_eq[-1]],
-            "total_return": [total_ret_bh, total_ret_strat],
-            "max_drawdown": [max_dd_bh, max_dd_strat],
-            "dd_duration": [dur_bh, dur_strat],
-            "ann_return": [ann_ret_bh, ann_ret_strat],
-            "ann_vol": [ann_vol_bh, ann_vol_strat],
-            "sharpe": [sharpe_bh, sharpe_strat],
-        },
-        index=["buy_and_hold", "lag_ols_strategy"],
-    )
+    #  out-of-sample variant: expanding-window fits, one year of burn-in
+    y_pred_wf = walk_forward_forecasts(X, y, min_periods=252)
+    wf_rets = run_forecast_strategy(y_pred_wf, y)
+
+    rows = {}
+    for name, rets in [("buy_and_hold", y),
+                       ("lag_ols_strategy", strat_rets),
+                       ("lag_ols_walk_forward", wf_rets)]:
+        eq = np.cumprod(1.0 + rets)
+        max_dd, dur = max_drawdown_and_duration(eq)
+        ann_ret = float(rets.mean() * 252.0)
+        ann_vol = float(rets.std(ddof=1) * np.sqrt(252.0))
+        rows[name] = {
+            "final_equity": eq[-1],
+            "total_return": float(eq[-1] - 1.0),
+            "max_drawdown": max_dd,
+            "dd_duration": dur,
+            "ann_return": ann_ret,
+            "ann_vol": ann_vol,
+            "sharpe": ann_ret / ann_vol if ann_vol > 0.0 else float("nan"),
+        }
+    summary = pd.DataFrame.from_dict(rows, orient="index")
 
     print("Vectorized lagged-returns OLS backtest on EURUSD")
     print(f"  samples={y.shape[0]}, lags={X.shape[1]}\n")
@@ -7,16 +7,25 @@ The Python Quants GmbH | https://tpq.io
 https://hilpisch.com | https://linktr.ee/dyjh
 """
 
+from typing import Iterable
+
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import sliding_window_view
 from pathlib import Path
 
+from drawdowns import max_drawdown_and_duration
+from price_store import load_column, open_panel
+from vecback_lag_ols import add_intercept, lag_matrix, walk_forward_forecasts
+
 plt.style.use("seaborn-v0_8")
 
 
 DATA_URL = ("https://raw.githubusercontent.com/yhilpisch/epatcode/"
             "refs/heads/main/data/epat_eod.csv")
+SWEEP_METRICS = ("final_equity", "total_return", "max_drawdown", "ann_return",
+                 "ann_vol", "sharpe", "hit_rate")  #  keys of sweep_metrics
 
 
 class LagOLSBacktest:
@@ -49,8 +58,7 @@ class LagOLSBacktest:
         else:
             src = DATA_URL
             print(f"Local data file {local_path} not found, loading from {DATA_URL}")
-        df = pd.read_csv(src, parse_dates=["Date"]).set_index("Date")
-        prices = df[self.column].astype(float).dropna()  # ensure numeric, drop gaps
+        prices = load_column(src, self.column)  # float prices without gaps
         self.prices = prices  # pandas Series indexed by date
 
     def _prepare_data(self) -> None:
@@ -61,25 +69,23 @@ class LagOLSBacktest:
         n = rets.shape[0]  # sample size in returns
         if n <= self.lags:
             raise ValueError("not enough observations for chosen lags")
-        X = np.column_stack(
-            [rets[(self.lags - k):(n - k)] for k in range(1, self.lags + 1)]
-        )  # columns r_{t-1},...,r_{t-lags}
+        X = lag_matrix(rets, self.lags)  # read-only view: r_{t-1},...,r_{t-lags}
         y = rets[self.lags:]  # target r_t
+        self.rets = rets  # full return series (used by sweep)
         self.X = X  # feature matrix
+        self.X_design = add_intercept(X)  # [1, X], built once for fit and run
         self.y = y  # dependent variable
         self.dates = dates[self.lags:]  # effective backtest dates
 
     def fit(self) -> None:
         """Estimate regression coefficients for return on lagged returns."""
-        X_design = np.column_stack([np.ones(self.X.shape[0]), self.X])
-        self.beta = np.linalg.lstsq(X_design, self.y, rcond=None)[0]  # OLS solution
+        self.beta = np.linalg.lstsq(self.X_design, self.y, rcond=None)[0]  # OLS solution
 
     def run_strategy(self) -> np.ndarray:
         """Compute strategy returns implied by the fitted model."""
         if self.beta is None:
             self.fit()
-        X_design = np.column_stack([np.ones(self.X.shape[0]), self.X])
-        y_pred = X_design @ self.beta  # one-step-ahead return forecasts
+        y_pred = self.X_design @ self.beta  # one-step-ahead return forecasts
         pos = np.sign(y_pred)  # desired position based on forecast sign
         strat_rets = pos * self.y  # gross strategy returns
         turnover = np.abs(pos[1:] - pos[:-1])  # trade size per step
@@ -88,6 +94,87 @@ class LagOLSBacktest:
         self.pos = pos  # realized positions
         return strat_rets
 
+    def sweep(self, lags: Iterable[int]=range(1, 51),
+              costs: Iterable[float]=(0.0, 0.0001, 0.0002, 0.0005)) -> pd.DataFrame:
+        """Evaluate many (lags, cost) configurations in one pass.
+
+        The design matrix is built once for the largest lag order, so
+        all configurations share the same sample (starting after the
+        largest lag) and are directly comparable. Because the models
+        are nested, every fit is a solve on the leading block of one
+        Gram matrix (X'X, X'y). Positions for all lag orders come from
+        a single matrix product, and all cost levels are applied in one
+        broadcasted step.
+
+        Returns a tidy DataFrame with one row per configuration.
+        """
+        grid, strat = self.sweep_returns(lags, costs)
+        return pd.concat([grid, pd.DataFrame(sweep_metrics(strat))], axis=1)
+
+    def sweep_returns(self, lags: Iterable[int]=range(1, 51),
+                      costs: Iterable[float]=(0.0, 0.0001, 0.0002, 0.0005),
+                      walk_forward: bool=False, window: int | None=None,
+                      min_periods: int=252) -> tuple[pd.DataFrame, np.ndarray]:
+        """Strategy returns of all (lags, cost) configurations of :meth:`sweep`.
+
+        Returns the grid (one row per configuration) and the matching
+        (time x configuration) return matrix, for example as candidate
+        universe for the multiple-testing corrections of
+        :mod:`multiple_testing`.
+
+        By default the betas are fitted on the full sample, so the
+        returns are in-sample. With ``walk_forward`` every forecast uses
+        coefficients fitted on earlier dates only (expanding window, or
+        the last ``window`` dates; see :func:`vecback_lag_ols.walk_forward_forecasts`),
+        and the first ``min_periods`` dates (burn-in without forecasts)
+        are dropped.
+        """
+        lag_grid = np.asarray(sorted(set(lags)), dtype=int)
+        cost_grid = np.asarray(list(costs), dtype=float)
+        max_lag = int(lag_grid[-1])
+        n = self.rets.shape[0]
+        if lag_grid[0] < 1 or n <= max_lag:
+            raise ValueError("lags must lie between 1 and the number of returns")
+
+        y = self.rets[max_lag:]  # common target r_t
+        X = lag_matrix(self.rets, max_lag)  # r_{t-1},...,r_{t-max_lag}
+        if walk_forward:
+            if not max_lag < min_periods < y.shape[0]:
+                raise ValueError("min_periods must exceed the largest lag order "
+                                 "and leave returns after the burn-in period")
+            if window is not None and window < min_periods:
+                raise ValueError("a rolling window shorter than min_periods "
+                                 "never produces a forecast")
+            forecasts = np.column_stack([
+                walk_forward_forecasts(X[:, :k], y, window, min_periods)
+                for k in lag_grid])
+            #  out-of-sample positions; dates without a forecast are flat,
+            #  as in run_forecast_strategy
+            pos = np.nan_to_num(np.sign(forecasts[min_periods:]))
+            y = y[min_periods:]
+        else:
+            Z = add_intercept(X)
+            gram = Z.T @ Z  # X'X including intercept
+            xty = Z.T @ y  # X'y including intercept
+
+            betas = np.zeros((max_lag + 1, lag_grid.shape[0]))  # one column per model
+            for j, k in enumerate(lag_grid):
+                betas[:k + 1, j] = np.linalg.solve(gram[:k + 1, :k + 1], xty[:k + 1])
+
+            pos = np.sign(Z @ betas)  # positions, shape (time, lag orders)
+        gross = pos * y[:, None]
+        turnover = np.abs(np.diff(pos, axis=0))
+        strat = np.repeat(gross[None], cost_grid.shape[0], axis=0)
+        strat[:, 1:, :] -= cost_grid[:, None, None] * turnover[None]
+
+        # flatten to (time, configuration) with cost as the outer loop
+        strat = strat.transpose(1, 0, 2).reshape(y.shape[0], -1)
+        grid = pd.DataFrame({
+            "lags": np.tile(lag_grid, cost_grid.shape[0]),
+            "cost": np.repeat(cost_grid, lag_grid.shape[0]),
+        })
+        return grid, strat
+
     def equity_curves(self) -> pd.DataFrame:
         """Return buy-and-hold and strategy equity curves as a DataFrame."""
         if self.strat_rets is None:
@@ -115,22 +202,138 @@ class LagOLSBacktest:
         plt.close(fig)
 
 
-def max_drawdown_and_duration(equity: np.ndarray) -> tuple[float, int]:
-    """Compute maximum drawdown and its duration (in periods)."""
+class PanelLagOLSBacktest:
+    """Lagged-returns OLS backtest for many instruments at once.
 
-    peak = np.maximum.accumulate(equity)
-    dd = equity / peak - 1.0  #  drawdown series (<= 0)
-    underwater = dd < 0.0
-    max_dur = 0
-    cur = 0
-    for flag in underwater:
-        if flag:
-            cur += 1
-            if cur > max_dur:
-                max_dur = cur
-        else:
-            cur = 0
-    return float(dd.min()), int(max_dur)
+    Every instrument gets its own regression of returns on their own
+    lags, exactly as in :class:`LagOLSBacktest`, but all regressions are
+    estimated together. Log-returns are computed from each instrument's
+    valid prices and left-aligned into an (asset x time) array padded
+    with NaN. The lagged design forms an (asset x time x lag) tensor in
+    which padded rows are zeroed out, so the per-asset Gram matrices can
+    be built with one ``einsum`` and solved with one batched
+    :func:`numpy.linalg.solve`. Assets are processed in chunks to bound
+    the size of the tensor for very wide panels.
+    """
+
+    def __init__(self, prices: pd.DataFrame, lags: int=7, cost: float=0.0001,
+                 chunk_size: int=256) -> None:
+        """Initialize backtest with a price panel (dates x instruments)."""
+        self.columns = [str(col) for col in prices.columns]
+        self.lags = lags  # number of past returns used as predictors
+        self.cost = cost  # proportional transaction cost parameter
+        self.chunk_size = chunk_size  # assets per batched solve
+        self._prepare_data(prices)
+        self.beta: np.ndarray | None = None
+        self.strat_rets: np.ndarray | None = None
+
+    @classmethod
+    def from_csv(cls, csv_path: str="data/epat_eod.csv",
+                 columns: list[str] | None=None, **kwargs) -> "PanelLagOLSBacktest":
+        """Build a panel backtest from the memory-mapped price store."""
+        panel = open_panel(csv_path)
+        columns = panel.columns if columns is None else columns
+        prices = pd.concat({col: panel.series(col) for col in columns}, axis=1)
+        return cls(prices, **kwargs)
+
+    def _prepare_data(self, prices: pd.DataFrame) -> None:
+        """Compute per-asset log-returns and left-align them in one array."""
+        series = [prices[col].dropna() for col in prices.columns]
+        n_rets = np.array([max(ser.shape[0] - 1, 0) for ser in series])
+        if (n_rets <= self.lags).any():
+            raise ValueError("not enough observations for chosen lags")
+        rets = np.full((len(series), n_rets.max()), np.nan)
+        for a, ser in enumerate(series):
+            rets[a, :n_rets[a]] = np.diff(np.log(ser.to_numpy(dtype=float)))
+        self.rets = rets  # (asset, time) log-returns, NaN padded at the end
+        self.n_obs = n_rets - self.lags  # usable regression rows per asset
+        self.dates = [ser.index[1 + self.lags:] for ser in series]
+
+    def _design(self, a0: int, a1: int) -> tuple[np.ndarray, np.ndarray]:
+        """Build the intercept-augmented lag tensor for assets a0:a1.
+
+        Padded rows are set to zero in both design and target, which
+        removes them from the Gram matrices.
+        """
+        rets = self.rets[a0:a1]
+        m = rets.shape[1] - self.lags
+        Z = np.empty((rets.shape[0], m, self.lags + 1))
+        Z[:, :, 0] = 1.0  # intercept
+        #  strided (asset, time, lag) view, copied once into the design
+        Z[:, :, 1:] = sliding_window_view(rets[:, :-1], self.lags, axis=1)[:, :, ::-1]
+        y = rets[:, self.lags:]
+        valid = np.arange(m)[None, :] < self.n_obs[a0:a1, None]
+        Z[~valid] = 0.0
+        return Z, np.where(valid, y, 0.0)
+
+    def fit(self) -> None:
+        """Estimate all per-asset regressions with batched linear algebra."""
+        beta = np.empty((self.rets.shape[0], self.lags + 1))
+        for a0 in range(0, self.rets.shape[0], self.chunk_size):
+            a1 = min(a0 + self.chunk_size, self.rets.shape[0])
+            Z, y = self._design(a0, a1)
+            gram = np.einsum("ati,atj->aij", Z, Z)  # stacked X'X
+            xty = np.einsum("ati,at->ai", Z, y)  # stacked X'y
+            beta[a0:a1] = np.linalg.solve(gram, xty[:, :, None])[:, :, 0]
+        self.beta = beta  # (asset, 1 + lags) coefficients
+
+    def run_strategy(self) -> np.ndarray:
+        """Compute per-asset strategy returns, shape (asset, time).
+
+        Row a holds the strategy returns of asset a on ``dates[a]``,
+        followed by NaN padding.
+        """
+        if self.beta is None:
+            self.fit()
+        m = self.rets.shape[1] - self.lags
+        strat_rets = np.full((self.rets.shape[0], m), np.nan)
+        for a0 in range(0, self.rets.shape[0], self.chunk_size):
+            a1 = min(a0 + self.chunk_size, self.rets.shape[0])
+            Z, y = self._design(a0, a1)
+            y_pred = np.einsum("ati,ai->at", Z, self.beta[a0:a1])  # forecasts
+            pos = np.sign(y_pred)
+            rets = pos * y  # gross strategy returns
+            rets[:, 1:] -= self.cost * np.abs(np.diff(pos, axis=1))  # costs
+            valid = np.arange(m)[None, :] < self.n_obs[a0:a1, None]
+            strat_rets[a0:a1][valid] = rets[valid]
+        self.strat_rets = strat_rets
+        return strat_rets
+
+    def strategy_returns_frame(self) -> pd.DataFrame:
+        """Return strategy returns as a DataFrame on the union of dates."""
+        if self.strat_rets is None:
+            self.run_strategy()
+        return pd.concat(
+            {
+                col: pd.Series(self.strat_rets[a, :self.n_obs[a]], index=self.dates[a])
+                for a, col in enumerate(self.columns)
+            },
+            axis=1,
+        )
+
+
+def sweep_metrics(strat_rets: np.ndarray,
+                  periods_per_year: int=252) -> dict[str, np.ndarray]:
+    """Compute summary metrics for every column of a return matrix.
+
+    Definitions follow the summary table of the main block (arithmetic
+    annualization of mean and volatility).
+    """
+    equity = np.cumprod(1.0 + strat_rets, axis=0)
+    peak = np.maximum.accumulate(equity, axis=0)
+    ann_ret = strat_rets.mean(axis=0) * periods_per_year
+    ann_vol = strat_rets.std(axis=0, ddof=1) * np.sqrt(periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(ann_vol > 0.0, ann_ret / ann_vol, np.nan)
+    return {
+        "final_equity": equity[-1],
+        "total_return": equity[-1] - 1.0,
+        "max_drawdown": (equity / peak - 1.0).min(axis=0),
+        "ann_return": ann_ret,
+        "ann_vol": ann_vol,
+        "sharpe": sharpe,
+        "hit_rate": (strat_rets > 0.0).mean(axis=0),
+    }
 
 
 if __name__ == "__main__":
@@ -186,3 +389,18 @@ if __name__ == "__main__":
             }
         ).T.to_string()
     )
+
+    sweep = backtest.sweep(lags=range(1, 21), costs=(0.0, 0.0001, 0.0005))
+    best = sweep.sort_values("sharpe", ascending=False).head(5)
+    print("\nTop lag/cost configurations by Sharpe ratio")
+    print(best.round(4).to_string(index=False))
+
+    panel = PanelLagOLSBacktest.from_csv(lags=backtest.lags, cost=backtest.cost)
+    panel_rets = panel.strategy_returns_frame()
+    panel_summary = {}
+    for col in panel_rets.columns:
+        metrics = sweep_metrics(panel_rets[col].dropna().to_numpy()[:, None])
+        panel_summary[col] = {name: float(val[0]) for name, val in metrics.items()}
+    panel_summary = pd.DataFrame(panel_summary)
+    print("\nPanelLagOLSBacktest across all instruments")
+    print(panel_summary.round(3).to_string())